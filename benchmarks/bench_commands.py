@@ -0,0 +1,274 @@
+###
+# see LICENSE.txt for information.
+###
+
+"""
+Benchmark: drive every public command through a stub irc against
+recorded fixtures (see the fixtures.* settings) and report per command
+fetch, parse and format time, peak RSS, replies and reply lines saved
+by packing. Each command runs in its own process so its peak RSS is its
+own. Then the same command mix from N concurrent callers, once calling
+the commands directly and once through callCommand, where they wait on
+the command executor like they do on irc. Results are written as JSON
+so runs can be compared over time.
+
+Record the fixtures once (needs the network), then replay offline:
+    python benchmarks/bench_commands.py --record path/to/fixtures
+    python benchmarks/bench_commands.py path/to/fixtures [-t 8] [-r 3] [-o out.json]
+
+Run from the plugin directory (needs the plugin's requirements).
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import threading
+import multiprocessing
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import supybot.conf as conf
+import supybot.ircmsgs as ircmsgs
+import config
+from plugin import MLB
+
+# (command, arguments). owner-only and channel-state commands are left out.
+COMMANDS = [
+    ('mlbcountdown', ''),
+    ('mlbteams', ''),
+    ('mlbpitcher', 'NYY'),
+    ('mlbworldseries', '2012'),
+    ('mlballstargame', '2013'),
+    ('mlbcyyoung', ''),
+    ('mlbarrests', ''),
+    ('mlbroster', 'NYY'),
+    ('mlbroster', '--40man NYY'),
+    ('mlbpayroll', 'NYY'),
+    ('mlbleaders', 'mlb hr'),
+    ('mlbcareerleaders', 'batting batavg'),
+    ('mlbawards', '2013'),
+    ('mlbschedule', 'NYY'),
+    ('mlbdailyleaders', ''),
+    ('mlbwildcard', ''),
+    ('mlbstandings', 'ALE'),
+    ('mlblineup', 'NYY'),
+    ('mlbinjury', 'NYY'),
+    ('mlbinjury', '--details NYY'),
+    ('mlbleagueleaders', 'AL hr'),
+    ('mlbprob', 'NYY'),
+    ('milbplayerseason', '2010 mike trout'),
+    ('milbplayerinfo', 'mike trout'),
+    ('mlbplayercontract', 'derek jeter'),
+    ('mlbplayernews', 'derek jeter'),
+    ('mlbcareerstats', 'derek jeter'),
+    ('mlbgame', 'derek jeter'),
+    ('mlbseasonstats', '2012 derek jeter'),
+    ('mlbplayerinfo', 'derek jeter'),
+    ('mlbgamestats', 'derek jeter'),
+]
+
+
+class StubIrc(object):
+    """Collects what a command replies."""
+
+    nick = 'bench'
+
+    def __init__(self):
+        self.replies, self.errors = [], []
+
+    def reply(self, s, *args, **kwargs):
+        self.replies.append(s)
+
+    def error(self, s='', Raise=False, *args, **kwargs):
+        self.errors.append(s)
+        if Raise:
+            raise Exception(s)
+
+    def errorInvalid(self, what, given=None, s='', Raise=True, *args, **kwargs):
+        self.error("{0} {1} {2}".format(what, given, s), Raise=Raise)
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of values (a sorted list)."""
+
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(p / 100.0 * (len(values) - 1))))]
+
+
+def run(mlb, command, args):
+    """Run one command, calling it directly (no callCommand, no executor). Returns its measurements."""
+
+    irc = StubIrc()
+    msg = ircmsgs.privmsg('#bench', '{0} {1}'.format(command, args), prefix='bench!bench@bench.example')
+    # commands are called directly (not through callCommand), so reset the phases here.
+    phases = mlb._phase
+    phases.fetch, phases.parse, phases.failed, phases.items, phases.lines = 0.0, 0.0, False, 0, 0
+    start = time.time()
+    try:
+        getattr(mlb, command)(irc, msg, args.split())
+    except Exception as e:
+        irc.errors.append(str(e))
+    total = time.time() - start
+    return {'total': total, 'fetch': phases.fetch, 'parse': phases.parse,
+            'format': max(0.0, total - phases.fetch - phases.parse),
+            'replies': len(irc.replies), 'saved': phases.items - phases.lines,
+            'errors': len(irc.errors) + (1 if phases.failed and not irc.errors else 0)}
+
+
+def measure(command, args, rounds, queue):
+    """In a child process: build the plugin, run command rounds times and put
+    (runs, peak RSS, RSS growth over the plugin's own) on queue."""
+
+    mlb = MLB(None)
+    try:
+        base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        runs = [run(mlb, command, args) for _ in range(rounds)]
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    finally:
+        mlb.die()
+    queue.put((runs, peak, peak - base))
+
+
+def single(rounds):
+    """Each command rounds times in a row, each command in a process of its own."""
+
+    out = {}
+    for (command, args) in COMMANDS:
+        name = "{0} {1}".format(command, args).strip()
+        queue = multiprocessing.Queue()
+        child = multiprocessing.Process(target=measure, args=(command, args, rounds, queue))
+        child.start()
+        (runs, peak, growth) = queue.get()
+        child.join()
+        totals = sorted(r['total'] for r in runs)
+        out[name] = {'calls': rounds,
+                     'p50_ms': percentile(totals, 50) * 1000,
+                     'max_ms': totals[-1] * 1000,
+                     'fetch_ms': sum(r['fetch'] for r in runs) * 1000 / rounds,
+                     'parse_ms': sum(r['parse'] for r in runs) * 1000 / rounds,
+                     'format_ms': sum(r['format'] for r in runs) * 1000 / rounds,
+                     'maxrss_kb': peak,
+                     'rss_growth_kb': growth,
+                     'replies': runs[-1]['replies'],
+                     'lines_saved': runs[-1]['saved'],
+                     'errors': sum(r['errors'] for r in runs)}
+    return out
+
+
+def concurrent(mlb, threads, rounds):
+    """Every command rounds times, spread over threads callers."""
+
+    work = [c for _ in range(rounds) for c in COMMANDS]
+    lock = threading.Lock()
+    results = []
+
+    def caller():
+        while True:
+            with lock:
+                if not work:
+                    return
+                (command, args) = work.pop()
+            r = run(mlb, command, args)
+            with lock:
+                results.append(r)
+
+    start = time.time()
+    workers = [threading.Thread(target=caller) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    wall = time.time() - start
+    totals = sorted(r['total'] for r in results)
+    return {'threads': threads, 'calls': len(results), 'wall_s': wall,
+            'throughput': len(results) / wall if wall else 0.0,
+            'p50_ms': percentile(totals, 50) * 1000,
+            'p95_ms': percentile(totals, 95) * 1000,
+            'p99_ms': percentile(totals, 99) * 1000,
+            'errors': sum(r['errors'] for r in results),
+            'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+
+
+def queued(mlb, threads, rounds):
+    """Every command rounds times through callCommand from threads callers, so they
+    are queued on the command executor. Timings come from the plugin's own mlbperf stats."""
+
+    work = [c for _ in range(rounds) for c in COMMANDS]
+    lock = threading.Lock()
+    irc = StubIrc()
+    executor = mlb._executor
+    rejected = executor.rejected
+    mlb._perf.clear()
+
+    def caller():
+        while True:
+            with lock:
+                if not work:
+                    return
+                (command, args) = work.pop()
+            msg = ircmsgs.privmsg('#bench', '{0} {1}'.format(command, args), prefix='bench!bench@bench.example')
+            mlb.callCommand([command], irc, msg, args.split())
+
+    start = time.time()
+    callers = [threading.Thread(target=caller) for _ in range(threads)]
+    for t in callers:
+        t.start()
+    for t in callers:
+        t.join()
+    while len(executor) or executor.running:  # callCommand only queues. wait for the workers.
+        time.sleep(0.05)
+    wall = time.time() - start
+    ms = lambda t: t * 1000
+    commands = {}
+    for (command, entry) in mlb._perf.summary().items():
+        commands[command] = {'calls': entry['calls'], 'errors': entry['errors'],
+                             'p50_ms': ms(entry['total'][0]), 'p95_ms': ms(entry['total'][1]),
+                             'queue_p50_ms': ms(entry['queue'][0]), 'queue_p95_ms': ms(entry['queue'][1])}
+    return {'threads': threads, 'calls': sum(c['calls'] for c in commands.values()), 'wall_s': wall,
+            'workers': config.MLB.executor.workers(), 'rejected': executor.rejected - rejected,
+            'commands': commands}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline MLB command benchmark.")
+    parser.add_argument('fixtures', help="directory of recorded responses")
+    parser.add_argument('--record', action='store_true', help="fetch from the sites and record instead of replaying")
+    parser.add_argument('-t', '--threads', type=int, default=8, help="concurrent callers (default 8)")
+    parser.add_argument('-r', '--rounds', type=int, default=3, help="runs of each command (default 3)")
+    parser.add_argument('-o', '--output', help="write JSON here instead of stdout")
+    opts = parser.parse_args()
+
+    datadir = tempfile.mkdtemp(prefix='mlbbench')
+    try:
+        conf.supybot.directories.data.setValue(datadir)
+        config.MLB.logURLs.setValue(False)
+        config.MLB.fixtures.directory.setValue(os.path.abspath(opts.fixtures))
+        config.MLB.fixtures.mode.setValue('record' if opts.record else 'replay')
+        result = {'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                  'mode': config.MLB.fixtures.mode(),
+                  'single': single(opts.rounds)}
+        # built after single() so its children never inherit this one's threads.
+        mlb = MLB(None)
+        try:
+            result['concurrent'] = concurrent(mlb, opts.threads, opts.rounds)
+            result['queued'] = queued(mlb, opts.threads, opts.rounds)
+        finally:
+            mlb.die()
+    finally:
+        shutil.rmtree(datadir, ignore_errors=True)
+
+    out = json.dumps(result, indent=1, sort_keys=True)
+    if opts.output:
+        with open(opts.output, 'w') as f:
+            f.write(out + '\n')
+    else:
+        print(out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+###
+# see LICENSE.txt for information.
+###
+
+"""
+Benchmark: page extraction throughput with many command threads, parsing
+in-thread (everyone shares the GIL) vs. through a process pool of 1..N
+workers like _extract does.
+
+Takes saved pages (e.g. a --40man roster, the player directory, a stats
+page); every table row is pulled to text, like the commands do.
+
+Run from the plugin directory (needs the plugin's requirements):
+    python benchmarks/bench_extract.py page.html [page.html ...] [-t 16] [-n 200]
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+import multiprocessing
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from plugin import extractrows
+
+SPECS = {'rows': ('//tr', './/td', None)}
+
+
+def drive(threads, count, pages, parse):
+    """Parse count pages (cycling through pages) from threads callers. Returns pages/second."""
+
+    work = [pages[i % len(pages)] for i in range(count)]
+    lock = threading.Lock()
+
+    def caller():
+        while True:
+            with lock:
+                if not work:
+                    return
+                page = work.pop()
+            parse(page)
+
+    start = time.time()
+    callers = [threading.Thread(target=caller) for _ in range(threads)]
+    for t in callers:
+        t.start()
+    for t in callers:
+        t.join()
+    return count / (time.time() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraction throughput, in-thread vs. process pool.")
+    parser.add_argument('pages', nargs='+', help="saved html pages")
+    parser.add_argument('-t', '--threads', type=int, default=16, help="concurrent command threads (default 16)")
+    parser.add_argument('-n', '--count', type=int, default=200, help="pages to parse per run (default 200)")
+    opts = parser.parse_args()
+
+    pages = []
+    for name in opts.pages:
+        with open(name, 'rb') as f:
+            pages.append(f.read())
+    print("{0} pages, {1:.0f} KB average, {2} threads, {3} cores".format(
+        len(pages), sum(len(p) for p in pages) / 1024.0 / len(pages), opts.threads, multiprocessing.cpu_count()))
+    print("{0:14} {1:>10} {2:>8}".format("MODE", "PAGES/S", "SCALING"))
+    base = drive(opts.threads, opts.count, pages, lambda page: extractrows(page, SPECS))
+    print("{0:14} {1:10.1f} {2:7.2f}x".format("in-thread", base, 1.0))
+    for workers in range(1, multiprocessing.cpu_count() + 1):
+        pool = multiprocessing.Pool(workers)
+        try:
+            rate = drive(opts.threads, opts.count, pages, lambda page: pool.apply_async(extractrows, (page, SPECS)).get())
+        finally:
+            pool.terminate()
+        print("{0:14} {1:10.1f} {2:7.2f}x".format("pool x{0}".format(workers), rate, rate / base))
+
+
+if __name__ == '__main__':
+    main()
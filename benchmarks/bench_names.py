@@ -0,0 +1,99 @@
+###
+# see LICENSE.txt for information.
+###
+
+"""
+Benchmark: _similarPlayers suggestions through NameIndex vs. the old
+full scan (jaro + damerau-levenshtein on every name, two full sorts).
+
+Uses a synthetic directory of tens of thousands of names unless a
+data db (MLB.db with a populated players table) is given.
+
+Run from the plugin directory (needs the plugin's requirements):
+    python benchmarks/bench_names.py [path/to/MLB.db]
+"""
+
+import os
+import sys
+import time
+import random
+import sqlite3
+from operator import itemgetter
+
+import jellyfish
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from plugin import NameIndex
+
+
+def syntheticplayers(n=40000, seed=1):
+    """Return n made up players (id, normname)."""
+
+    rnd = random.Random(seed)
+    letters = u'abcdefghijklmnoprstuvwy'
+    firsts = [u''.join(rnd.choice(letters) for _ in range(rnd.randint(3, 8))) for _ in range(250)]
+    lasts = [u''.join(rnd.choice(letters) for _ in range(rnd.randint(4, 10))) for _ in range(250)]
+    names = [u"{0} {1}".format(f, l) for f in firsts for l in lasts][:n]
+    return [{'id': str(i), 'normname': name} for (i, name) in enumerate(names)]
+
+
+def dbplayers(dbfile):
+    """Return the players from a data db."""
+
+    with sqlite3.connect(dbfile) as conn:
+        return [{'id': i, 'normname': n} for (i, n) in conn.execute("SELECT id, normname FROM players")]
+
+
+def oldsimilar(players, optname):
+    """_similarPlayers as it was, minus the download."""
+
+    jaro, damerau = [], []
+    for row in players:
+        jaro.append({'jaro': jellyfish.jaro_distance(optname, row['normname']), 'id': row['id']})
+        damerau.append({'damerau': jellyfish.damerau_levenshtein_distance(optname, row['normname']), 'id': row['id']})
+    jarolist = sorted(jaro, key=itemgetter('jaro'), reverse=True)[0:5]
+    dameraulist = sorted(damerau, key=itemgetter('damerau'), reverse=False)[0:5]
+    return [k for k in jarolist if k['id'] in [f['id'] for f in dameraulist]]
+
+
+def typo(rnd, name):
+    """Return name with one random character dropped, swapped or replaced."""
+
+    i = rnd.randrange(len(name) - 1)
+    op = rnd.choice(('drop', 'swap', 'replace'))
+    if op == 'drop':
+        return name[:i] + name[i+1:]
+    if op == 'swap':
+        return name[:i] + name[i+1] + name[i] + name[i+2:]
+    return name[:i] + rnd.choice(u'aeiou') + name[i+1:]
+
+
+def main():
+    players = dbplayers(sys.argv[1]) if len(sys.argv) > 1 else syntheticplayers()
+    rnd = random.Random(2)
+    sample = rnd.sample(players, 200)
+    queries = [typo(rnd, p['normname']) for p in sample]
+
+    start = time.time()
+    index = NameIndex(players)
+    print("{0} names. index built in {1:.2f}s".format(len(index), time.time() - start))
+
+    start = time.time()
+    found = sum(1 for (q, p) in zip(queries, sample) if p['id'] in [m['id'] for m in index.search(q)])
+    cold = (time.time() - start) / len(queries)
+    start = time.time()
+    for q in queries:
+        index.search(q)
+    memo = (time.time() - start) / len(queries)
+    start = time.time()
+    oldfound = sum(1 for (q, p) in zip(queries[:20], sample[:20]) if p['id'] in [m['id'] for m in oldsimilar(players, q)])
+    old = (time.time() - start) / 20
+
+    print("{0:14} {1:>12} {2:>8}".format("PATH", "MS/QUERY", "RECALL"))
+    print("{0:14} {1:12.3f} {2:7.0f}%".format("old scan", old * 1000, 100.0 * oldfound / 20))
+    print("{0:14} {1:12.3f} {2:7.0f}%".format("index", cold * 1000, 100.0 * found / len(queries)))
+    print("{0:14} {1:12.4f} {2:>8}".format("index (memo)", memo * 1000, "-"))
+
+
+if __name__ == '__main__':
+    main()
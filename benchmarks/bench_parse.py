@@ -0,0 +1,81 @@
+###
+# see LICENSE.txt for information.
+###
+
+"""
+Benchmark: parse time per command page, lxml extraction layer vs. the
+old BeautifulSoup 3 path (convertEntities + findAll rows + getText).
+
+Takes a directory of saved pages, one per command, named after the
+command (mlbroster.html, mlbschedule.html, mlbinjury.html, ...). Each
+page is parsed and every table row's cells are pulled to text, which is
+what the commands do. The BS3 column is skipped if it isn't installed.
+
+Run from the plugin directory (needs the plugin's requirements):
+    python benchmarks/bench_parse.py path/to/pages [iterations]
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from plugin import MLB
+
+try:
+    from BeautifulSoup import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+
+def extractor():
+    """Return an MLB instance with only the extraction layer set up."""
+
+    mlb = MLB.__new__(MLB)
+    mlb._parsers = threading.local()
+    return mlb
+
+
+def newparse(mlb, page):
+    """lxml: parse and pull every row's cells to text."""
+
+    tree = mlb._tree(page)
+    return [[mlb._text(td) for td in mlb._tdsxp(tr)] for tr in mlb._findall(tree, '//tr')]
+
+
+def oldparse(page):
+    """BS3 as the commands used it."""
+
+    soup = BeautifulSoup(page, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
+    return [[td.getText().encode('utf-8') for td in tr.findAll('td')] for tr in soup.findAll('tr')]
+
+
+def timeit(fn, args, iterations):
+    """Return ms per call of fn(*args)."""
+
+    start = time.time()
+    for _ in range(iterations):
+        fn(*args)
+    return (time.time() - start) * 1000 / iterations
+
+
+def main():
+    pagedir = sys.argv[1]
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    mlb = extractor()
+    print("{0:24} {1:>8} {2:>6} {3:>10} {4:>10} {5:>8}".format("COMMAND", "KB", "ROWS", "BS3 MS", "LXML MS", "SPEEDUP"))
+    for name in sorted(os.listdir(pagedir)):
+        with open(os.path.join(pagedir, name), 'rb') as f:
+            page = f.read()
+        rows = len(newparse(mlb, page))
+        new = timeit(newparse, (mlb, page), iterations)
+        if BeautifulSoup:
+            old = timeit(oldparse, (page,), iterations)
+            print("{0:24} {1:8.1f} {2:6} {3:10.2f} {4:10.2f} {5:7.1f}x".format(os.path.splitext(name)[0], len(page) / 1024.0, rows, old, new, old / new))
+        else:
+            print("{0:24} {1:8.1f} {2:6} {3:>10} {4:10.2f} {5:>8}".format(os.path.splitext(name)[0], len(page) / 1024.0, rows, "-", new, "-"))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+###
+# see LICENSE.txt for information.
+###
+
+"""
+Micro-benchmark: team lookups through TeamRegistry vs. the old
+per-call sqlite3.connect path.
+
+Run from the plugin directory (needs the plugin's requirements):
+    python benchmarks/bench_teams.py [iterations]
+"""
+
+import os
+import sys
+import sqlite3
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from plugin import TeamRegistry
+
+MLBDB = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'db', 'mlb.db'))
+REGISTRY = TeamRegistry(MLBDB)
+
+
+def oldvalidteams(optteam):
+    """_validteams as it was: one connection per call."""
+
+    with sqlite3.connect(MLBDB) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT team FROM mlbteamaliases WHERE teamalias=?", (optteam.lower(),))
+        aliasrow = cursor.fetchone()
+        if aliasrow:
+            return str(aliasrow[0])
+        cursor.execute("SELECT team FROM mlb WHERE team=?", (optteam.upper(),))
+        teamrow = cursor.fetchone()
+        return str(teamrow[0]) if teamrow else None
+
+
+def oldtranslateteam(db, column, optteam):
+    """_translateTeam as it was: one connection per call."""
+
+    with sqlite3.connect(MLBDB) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT %s FROM mlb WHERE %s=?" % (db, column), (optteam,))
+        return str(cursor.fetchone()[0])
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    cases = [
+        ('validteams (alias)', lambda: oldvalidteams('bosox'), lambda: REGISTRY.validate('bosox')),
+        ('validteams (team)', lambda: oldvalidteams('nyy'), lambda: REGISTRY.validate('nyy')),
+        ('translateTeam', lambda: oldtranslateteam('team', 'yname', 'Chi Cubs'), lambda: REGISTRY.translate('team', 'yname', 'Chi Cubs')),
+    ]
+    print("{0:22} {1:>12} {2:>12} {3:>9}".format("LOOKUP", "SQLITE us", "REGISTRY us", "SPEEDUP"))
+    for (name, old, new) in cases:
+        assert old() == new()  # same answers.
+        oldus = timeit.timeit(old, number=n) / n * 1e6
+        newus = timeit.timeit(new, number=n) / n * 1e6
+        print("{0:22} {1:12.2f} {2:12.3f} {3:8.0f}x".format(name, oldus, newus, oldus / newus))
+
+
+if __name__ == '__main__':
+    main()
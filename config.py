@@ -17,7 +17,65 @@ def configure(advanced):
     conf.registerPlugin('MLB', True)
 
 
+class FixtureMode(registry.OnlySomeStrings):
+    validStrings = ('off', 'record', 'replay')
+
+
 MLB = conf.registerPlugin('MLB')
 conf.registerGlobalValue(MLB, 'logURLs', registry.Boolean(True, """Should we log all URL calls?"""))
+conf.registerGlobalValue(MLB, 'httpTimeout', registry.PositiveInteger(10, """Seconds to wait on a remote site before giving up."""))
+conf.registerGlobalValue(MLB, 'httpPoolSize', registry.PositiveInteger(10, """Keep-alive connections to keep open per host. Takes effect on reload."""))
+conf.registerGlobalValue(MLB, 'fetchWorkers', registry.PositiveInteger(5, """Worker threads for commands that fetch several pages at once. Takes effect on reload."""))
+conf.registerGlobalValue(MLB, 'maxTeams', registry.PositiveInteger(10, """Most teams mlbinjury, mlbschedule and mlbpayroll take at once (a team list or division codes)."""))
+conf.registerGlobalValue(MLB, 'probablesRefresh', registry.PositiveInteger(1800, """Seconds between rebuilds of the all-teams probables index. Takes effect on reload."""))
+conf.registerGlobalValue(MLB, 'standingsRefresh', registry.PositiveInteger(300, """Seconds before the standings snapshot (all divisions and wildcards) is rebuilt."""))
+conf.registerGlobalValue(MLB, 'playersRefresh', registry.PositiveInteger(86400, """Seconds between background refreshes of the player directory. Takes effect on reload."""))
+conf.registerGlobalValue(MLB, 'playerProfileTTL', registry.PositiveInteger(120, """Seconds a parsed player page is shared between player commands."""))
+conf.registerGroup(MLB, 'playerURLs')
+conf.registerGlobalValue(MLB.playerURLs, 'ttl', registry.PositiveInteger(2592000, """Seconds to remember the page found for a player name."""))
+conf.registerGlobalValue(MLB.playerURLs, 'negativeTTL', registry.PositiveInteger(3600, """Seconds to remember that a player name found nothing."""))
+conf.registerGroup(MLB, 'scoreboard')
+conf.registerGlobalValue(MLB.scoreboard, 'refresh', registry.PositiveInteger(120, """Seconds between scoreboard snapshot refreshes. Takes effect on reload."""))
+conf.registerGlobalValue(MLB.scoreboard, 'startHour', registry.NonNegativeInteger(12, """Hour (bot local time) game-hours scoreboard refreshes start."""))
+conf.registerGlobalValue(MLB.scoreboard, 'endHour', registry.NonNegativeInteger(24, """Hour (bot local time) game-hours scoreboard refreshes stop."""))
+conf.registerGlobalValue(MLB.scoreboard, 'finalBoxTTL', registry.PositiveInteger(86400, """Seconds to keep the pitching of a final box score."""))
+conf.registerGroup(MLB, 'cache')
+conf.registerGlobalValue(MLB.cache, 'maxBytes', registry.PositiveInteger(8388608, """Maximum bytes of page bodies to keep in memory. Takes effect on reload."""))
+conf.registerGlobalValue(MLB.cache, 'static', registry.NonNegativeInteger(86400, """Seconds to cache history pages (World Series, All-Star Game, awards). 0 disables."""))
+conf.registerGlobalValue(MLB.cache, 'leaders', registry.NonNegativeInteger(900, """Seconds to cache leaderboard pages. 0 disables."""))
+conf.registerGlobalValue(MLB.cache, 'live', registry.NonNegativeInteger(60, """Seconds to cache scoreboard, box score and standings pages. 0 disables."""))
+conf.registerGlobalValue(MLB.cache, 'lineup', registry.NonNegativeInteger(600, """Seconds to cache lineup pages. 0 disables."""))
+conf.registerGlobalValue(MLB.cache, 'box', registry.NonNegativeInteger(60, """Seconds to cache box scores. 0 disables."""))
+conf.registerGroup(MLB, 'prefetch')
+conf.registerGlobalValue(MLB.prefetch, 'workers', registry.PositiveInteger(2, """Worker threads for background prefetch. Takes effect on reload."""))
+conf.registerGlobalValue(MLB.prefetch, 'delay', registry.Float(1.0, """Seconds each prefetch worker waits between fetches."""))
+# (job, interval, startHour, endHour). hours are bot local time. startHour > endHour wraps around midnight.
+for (job, interval, start, end) in (('lineups', 600, 15, 20), ('probables', 3600, 7, 12), ('standings', 1800, 22, 3),
+                                    ('schedule', 86400, 6, 12), ('dailyleaders', 1800, 22, 3)):
+    conf.registerGroup(MLB.prefetch, job)
+    conf.registerGlobalValue(MLB.prefetch.get(job), 'interval', registry.NonNegativeInteger(interval, """Seconds between %s prefetches. 0 disables.""" % job))
+    conf.registerGlobalValue(MLB.prefetch.get(job), 'startHour', registry.NonNegativeInteger(start, """Hour (bot local time) %s prefetches start.""" % job))
+    conf.registerGlobalValue(MLB.prefetch.get(job), 'endHour', registry.NonNegativeInteger(end, """Hour (bot local time) %s prefetches stop.""" % job))
+conf.registerGroup(MLB, 'parse')
+conf.registerGlobalValue(MLB.parse, 'workers', registry.NonNegativeInteger(2, """Worker processes for parsing big pages. 0 parses in the command thread. Takes effect on reload."""))
+conf.registerGlobalValue(MLB.parse, 'minBytes', registry.NonNegativeInteger(32768, """Pages smaller than this are parsed in the command thread; shipping them to a worker costs more than it saves."""))
+conf.registerGroup(MLB, 'swr')
+conf.registerGlobalValue(MLB.swr, 'soft', registry.PositiveInteger(300, """Seconds parsed rosters, injuries, schedules and leaders are served before a background refresh is started."""))
+conf.registerGlobalValue(MLB.swr, 'hard', registry.PositiveInteger(3600, """Seconds after which we wait for fresh data instead. If that fails the old data is served, marked with its age."""))
+conf.registerGroup(MLB, 'health')
+conf.registerGlobalValue(MLB.health, 'failures', registry.PositiveInteger(5, """Failed requests in a row before a host is skipped (its circuit opens). Takes effect on reload."""))
+conf.registerGlobalValue(MLB.health, 'cooldown', registry.PositiveInteger(60, """Seconds a failing host is skipped before one request is let through to test it. Takes effect on reload."""))
+conf.registerGroup(MLB, 'executor')
+conf.registerGlobalValue(MLB.executor, 'workers', registry.PositiveInteger(8, """Commands that run at the same time. Takes effect on reload."""))
+conf.registerGlobalValue(MLB.executor, 'depth', registry.PositiveInteger(32, """Commands that can wait for a worker before we reply that we're busy. Takes effect on reload."""))
+conf.registerGlobalValue(MLB.executor, 'perUser', registry.PositiveInteger(3, """Commands one user can have waiting. Takes effect on reload."""))
+conf.registerGroup(MLB, 'pages')
+conf.registerGlobalValue(MLB.pages, 'lines', registry.PositiveInteger(3, """Lines of a long reply sent at once. The rest are kept for mlbmore."""))
+conf.registerGlobalValue(MLB.pages, 'ttl', registry.PositiveInteger(300, """Seconds the rest of a long reply is kept for mlbmore. Takes effect on reload."""))
+conf.registerGroup(MLB, 'perf')
+conf.registerGlobalValue(MLB.perf, 'samples', registry.PositiveInteger(512, """Calls of each command kept for the mlbperf percentiles. Takes effect on reload."""))
+conf.registerGroup(MLB, 'fixtures')
+conf.registerGlobalValue(MLB.fixtures, 'mode', FixtureMode('off', """off: fetch from the sites. record: fetch and save every response to fixtures.directory. replay: serve only from fixtures.directory, never touching the network."""))
+conf.registerGlobalValue(MLB.fixtures, 'directory', registry.String('', """Directory of recorded responses. Empty means MLB-fixtures in the bot's data directory."""))
 
 # vim:set shiftwidth=4 tabstop=4 expandtab textwidth=250:
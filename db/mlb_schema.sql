@@ -120,3 +120,41 @@ INSERT INTO mlbteamaliases (team, teamalias) values ('WSH','washington');
 INSERT INTO mlbteamaliases (team, teamalias) values ('WSH','nationals');
 INSERT INTO mlbteamaliases (team, teamalias) values ('WSH','nats');
 INSERT INTO mlbteamaliases (team, teamalias) values ('WSH','expos');
+
+/* MLB DIVISIONS */
+CREATE TABLE mlbdivisions (
+    team TEXT PRIMARY KEY,
+    division TEXT,
+    FOREIGN KEY(team) REFERENCES mlb(team)
+);
+/* ONE ROW PER TEAM. DIVISION CODES MATCH MLBSTANDINGS (ALE, ALC, ALW, NLE, NLC, NLW). */
+INSERT INTO mlbdivisions (team, division) values ('ARI','NLW');
+INSERT INTO mlbdivisions (team, division) values ('ATL','NLE');
+INSERT INTO mlbdivisions (team, division) values ('BAL','ALE');
+INSERT INTO mlbdivisions (team, division) values ('BOS','ALE');
+INSERT INTO mlbdivisions (team, division) values ('CHC','NLC');
+INSERT INTO mlbdivisions (team, division) values ('CIN','NLC');
+INSERT INTO mlbdivisions (team, division) values ('CLE','ALC');
+INSERT INTO mlbdivisions (team, division) values ('COL','NLW');
+INSERT INTO mlbdivisions (team, division) values ('CWS','ALC');
+INSERT INTO mlbdivisions (team, division) values ('DET','ALC');
+INSERT INTO mlbdivisions (team, division) values ('HOU','ALW');
+INSERT INTO mlbdivisions (team, division) values ('KC','ALC');
+INSERT INTO mlbdivisions (team, division) values ('LAA','ALW');
+INSERT INTO mlbdivisions (team, division) values ('LAD','NLW');
+INSERT INTO mlbdivisions (team, division) values ('MIA','NLE');
+INSERT INTO mlbdivisions (team, division) values ('MIL','NLC');
+INSERT INTO mlbdivisions (team, division) values ('MIN','ALC');
+INSERT INTO mlbdivisions (team, division) values ('NYM','NLE');
+INSERT INTO mlbdivisions (team, division) values ('NYY','ALE');
+INSERT INTO mlbdivisions (team, division) values ('OAK','ALW');
+INSERT INTO mlbdivisions (team, division) values ('PHI','NLE');
+INSERT INTO mlbdivisions (team, division) values ('PIT','NLC');
+INSERT INTO mlbdivisions (team, division) values ('SD','NLW');
+INSERT INTO mlbdivisions (team, division) values ('SEA','ALW');
+INSERT INTO mlbdivisions (team, division) values ('SF','NLW');
+INSERT INTO mlbdivisions (team, division) values ('STL','NLC');
+INSERT INTO mlbdivisions (team, division) values ('TB','ALE');
+INSERT INTO mlbdivisions (team, division) values ('TEX','ALW');
+INSERT INTO mlbdivisions (team, division) values ('TOR','ALE');
+INSERT INTO mlbdivisions (team, division) values ('WSH','NLE');
@@ -4,22 +4,34 @@
 ###
 
 # my libs.
-from BeautifulSoup import BeautifulSoup, Comment
 from urllib import quote_plus
-from lxml import html
+from urlparse import urlparse
+from lxml import html, etree
 import requests
+from requests.adapters import HTTPAdapter
 import re
+import getopt
 import collections
 import datetime
 import random
+import heapq
+import hashlib
+import json
 import sqlite3
 from itertools import groupby, count
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import os.path
+import stat
+import signal
+import threading
+import time
 from base64 import b64decode
 import jellyfish  # similar players.
-from operator import itemgetter  # similar players.
 # supybot libs.
+import supybot.conf as conf
 import supybot.utils as utils
+import supybot.schedule as schedule
 from supybot.commands import *
 import supybot.plugins as plugins
 import supybot.ircutils as ircutils
@@ -28,20 +40,764 @@ from supybot.i18n import PluginInternationalization, internationalizeDocstring
 
 _ = PluginInternationalization('MLB')
 
+class ResponseCache(object):
+    """Thread-safe in-memory cache of fetched pages keyed by URL.
+
+    Entries carry their own TTL. Expired entries are kept (but not served by
+    get) until the least recently used ones are evicted once the total size
+    of the cached bodies goes over maxbytes.
+    """
+
+    def __init__(self, maxbytes):
+        self.maxbytes = maxbytes
+        self.size = 0
+        self.hits, self.misses, self.evictions = 0, 0, 0
+        self._entries = collections.OrderedDict()  # key -> (expires, body). oldest first.
+        self._lock = threading.Lock()
+
+    def get(self, key, stale=False):
+        """Return the cached body for key or None if missing/expired.
+        With stale, expired bodies are returned too (for when the site is down)."""
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = entry  # reinsert so it is the most recently used.
+            if entry[0] < time.time() and not stale:  # expired.
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, body, ttl):
+        """Store body under key for ttl seconds, evicting LRU entries over maxbytes."""
+
+        if ttl <= 0 or len(body) > self.maxbytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self.size -= len(old[1])
+            self._entries[key] = (time.time() + ttl, body)
+            self.size += len(body)
+            while self.size > self.maxbytes:
+                (k, (expires, oldbody)) = self._entries.popitem(last=False)
+                self.size -= len(oldbody)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry. Counters are kept."""
+
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SingleFlight(object):
+    """Collapse concurrent calls that share a key into a single call.
+
+    The first caller for a key runs the function. Callers that arrive while
+    it is still running block and get the same result (or exception).
+    """
+
+    def __init__(self):
+        self.calls, self.coalesced = 0, 0
+        self._inflight = {}  # key -> [event, result, error]
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) unless a call for key is already running."""
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:  # nobody is fetching this yet.
+                call = [threading.Event(), None, None]
+                self._inflight[key] = call
+                self.calls += 1
+            else:
+                self.coalesced += 1
+        if not leader:  # wait on the leader.
+            call[0].wait()
+            if call[2]:
+                raise call[2]
+            return call[1]
+        try:
+            call[1] = fn(*args, **kwargs)
+        except Exception as e:
+            call[2] = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call[0].set()
+        return call[1]
+
+
+class HostHealth(object):
+    """Latency, error rate and a circuit breaker for each host we fetch from.
+
+    A host's circuit is closed (requests go through) until `threshold` requests
+    in a row fail. It is then open and requests fail fast for `cooldown` seconds.
+    After that it is half-open: one probe request is let through. If it works the
+    circuit closes again, if not it opens for another cooldown.
+    """
+
+    def __init__(self, threshold, cooldown, alpha=0.2):
+        self.threshold, self.cooldown, self.alpha = threshold, cooldown, alpha
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host):
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = {'state': 'closed', 'latency': None, 'errorrate': 0.0, 'streak': 0,
+                                         'opened': 0, 'requests': 0, 'failures': 0, 'fastfails': 0}
+        return entry
+
+    def allow(self, host):
+        """Return True if a request to host should be made now."""
+
+        with self._lock:
+            entry = self._host(host)
+            if entry['state'] == 'closed':
+                return True
+            if entry['state'] == 'open' and entry['opened'] + self.cooldown <= time.time():
+                entry['state'] = 'half-open'  # let this one through as the probe.
+                return True
+            entry['fastfails'] += 1
+            return False
+
+    def _record(self, host, elapsed, failed):
+        with self._lock:
+            entry = self._host(host)
+            entry['requests'] += 1
+            entry['latency'] = elapsed if entry['latency'] is None else (1 - self.alpha) * entry['latency'] + self.alpha * elapsed
+            entry['errorrate'] = (1 - self.alpha) * entry['errorrate'] + self.alpha * (1.0 if failed else 0.0)
+            if not failed:
+                entry['state'], entry['streak'] = 'closed', 0
+                return
+            entry['failures'] += 1
+            entry['streak'] += 1
+            if entry['state'] == 'half-open' or entry['streak'] >= self.threshold:
+                entry['state'], entry['opened'] = 'open', time.time()
+
+    def success(self, host, elapsed):
+        """A request to host answered in elapsed seconds."""
+
+        self._record(host, elapsed, False)
+
+    def failure(self, host, elapsed):
+        """A request to host failed (timeout, connection error or 5xx) after elapsed seconds."""
+
+        self._record(host, elapsed, True)
+
+    def states(self):
+        """Return {host: entry} copies for display."""
+
+        with self._lock:
+            return dict((k, dict(v)) for (k, v) in self._hosts.items())
+
+
+class FixtureStore(object):
+    """Recorded HTTP responses on disk, for running commands offline.
+
+    Each response is kept as <key>.body (the raw bytes) and <key>.json (url,
+    status and headers), where key is the sha1 of the url plus any POST data.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _key(self, url, data=None):
+        key = url
+        if data:  # POSTs to the same url are told apart by their data.
+            key += '\n' + repr(sorted(data.items()) if hasattr(data, 'items') else data)
+        return hashlib.sha1(key).hexdigest()
+
+    def load(self, url, data=None):
+        """Return (body, headers) recorded for url or None."""
+
+        path = os.path.join(self.directory, self._key(url, data))
+        try:
+            with open(path + '.body', 'rb') as f:
+                body = f.read()
+            with open(path + '.json', 'rb') as f:
+                meta = json.load(f)
+        except (IOError, ValueError):
+            return None
+        return (body, meta.get('headers', {}))
+
+    def save(self, url, data, body, status, headers):
+        """Record a response for url."""
+
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        path = os.path.join(self.directory, self._key(url, data))
+        with open(path + '.body', 'wb') as f:
+            f.write(body)
+        with open(path + '.json', 'wb') as f:
+            json.dump({'url': url, 'status': status, 'headers': dict(headers)}, f, indent=1, sort_keys=True)
+
+
+class TeamRegistry(object):
+    """Read-only in-memory copy of the mlb, mlbteamaliases and mlbdivisions tables.
+
+    Every column of mlb is indexed so lookups are a dict get. The object is
+    never changed once built; a new one replaces it when the db changes.
+    """
+
+    def __init__(self, dbfile):
+        self.mtime = os.path.getmtime(dbfile)
+        with sqlite3.connect(dbfile) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM mlb")
+            columns = tuple([str(c[0]) for c in cursor.description])
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            cursor.execute("SELECT teamalias, team FROM mlbteamaliases")
+            aliases = cursor.fetchall()
+            try:
+                cursor.execute("SELECT division, team FROM mlbdivisions ORDER BY team")
+                divisions = cursor.fetchall()
+            except sqlite3.OperationalError:  # db from before mlbdivisions.
+                divisions = []
+        self.columns = columns
+        self.teams = tuple(sorted([str(row['team']) for row in rows]))
+        # column -> {value: row}. values are compared as strings like sqlite does.
+        self._index = dict((c, dict((unicode(row[c]), row) for row in rows)) for c in columns)
+        self._aliases = dict((alias.lower(), str(team)) for (alias, team) in aliases)
+        self.divisions = collections.OrderedDict()  # ALE -> (BAL, BOS, ...)
+        for (division, team) in sorted(divisions):
+            self.divisions[str(division)] = self.divisions.get(str(division), ()) + (str(team),)
+
+    def validate(self, optteam):
+        """Return the team (NYY) for optteam (team or alias) or None."""
+
+        team = self._aliases.get(optteam.lower())  # check aliases first.
+        if team:
+            return team
+        if optteam.upper() in self._index['team']:  # standard lookup. go upper. nyy->NYY.
+            return optteam.upper()
+        return None
+
+    def expand(self, optteams):
+        """Return (teams, unknown) for a comma-separated list of teams, aliases and
+        division codes (NYY,BOS or ALE,NLE). teams keeps the order given, without repeats."""
+
+        teams, unknown = [], []
+        for opt in [o.strip() for o in optteams.split(',') if o.strip()]:
+            found = self.divisions.get(opt.upper()) or [self.validate(opt)]
+            if found[0] is None:
+                unknown.append(opt)
+            teams.extend([t for t in found if t and t not in teams])
+        return (teams, unknown)
+
+    def translate(self, db, column, optteam):
+        """Return column db for the team whose column matches optteam. KeyError if none."""
+
+        return str(self._index[column][unicode(optteam)][db])
+
+
+class NameIndex(object):
+    """Fuzzy search over the player directory's normalized names.
+
+    Candidates are narrowed with character trigrams (rarest first) and
+    metaphone keys before the jaro and damerau-levenshtein distances run.
+    Top-k is taken with a heap and results are memoized per query.
+    """
+
+    def __init__(self, players, candidates=64, memo=1024):
+        self.candidates = candidates
+        self.memosize = memo
+        self._ids = [p['id'] for p in players]
+        self._names = [unicode(p['normname']) for p in players]
+        self._grams = collections.defaultdict(list)  # trigram -> [name index]
+        self._sounds = collections.defaultdict(list)  # metaphone -> [name index]
+        for (i, name) in enumerate(self._names):
+            for gram in self._trigrams(name):
+                self._grams[gram].append(i)
+            for key in self._metaphones(name):
+                self._sounds[key].append(i)
+        # once we have enough candidates, stop walking trigram postings after this many entries.
+        self._budget = 1000
+        self._memo = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._names)
+
+    @staticmethod
+    def _trigrams(name):
+        """Return the set of trigrams of name, padded so word starts count."""
+
+        padded = u"  {0} ".format(name)
+        return set(padded[i:i+3] for i in range(len(padded) - 2))
+
+    @staticmethod
+    def _metaphones(name):
+        """Return the set of metaphone keys of each word in name."""
+
+        keys = set()
+        for token in name.split():
+            try:
+                keys.add(jellyfish.metaphone(token))
+            except Exception:  # odd characters.
+                continue
+        return keys
+
+    def _candidates(self, query):
+        """Return the indexes of the names sharing the most trigrams/sounds with query."""
+
+        counts = collections.defaultdict(int)
+        seen = 0  # postings walked so far.
+        for gram in sorted(self._trigrams(query), key=lambda g: len(self._grams.get(g, ()))):
+            posting = self._grams.get(gram)
+            if not posting:
+                continue
+            if len(counts) >= self.candidates and seen + len(posting) > self._budget:
+                break  # rarest first so the rest are only more common.
+            seen += len(posting)
+            for i in posting:
+                counts[i] += 1
+        for key in self._metaphones(query):
+            for i in self._sounds.get(key, ()):
+                counts[i] += 2  # sounding alike counts for more.
+        return heapq.nlargest(self.candidates, counts, key=counts.get)
+
+    def search(self, query, k=5):
+        """Return up to k dicts (fullname, id) of the names most similar to query.
+        Names in both the top k by jaro and top k by damerau-levenshtein win.
+        If none are in both, the top two of each are returned."""
+
+        query = unicode(query)
+        with self._lock:
+            result = self._memo.pop(query, None)
+            if result is not None:
+                self._memo[query] = result  # most recently used.
+                return result
+        jaro, damerau = [], []
+        for i in self._candidates(query):
+            jaro.append((jellyfish.jaro_distance(query, self._names[i]), i))
+            damerau.append((jellyfish.damerau_levenshtein_distance(query, self._names[i]), i))
+        jarolist = heapq.nlargest(k, jaro)
+        dameraulist = heapq.nsmallest(k, damerau)
+        ids = set(i for (score, i) in dameraulist)
+        matching = [i for (score, i) in jarolist if i in ids]
+        if not matching:
+            matching = [i for pair in zip(jarolist, dameraulist)[:2] for (score, i) in pair]
+        result = [{'fullname': self._names[i], 'id': self._ids[i]} for i in matching]
+        with self._lock:
+            self._memo[query] = result
+            if len(self._memo) > self.memosize:
+                self._memo.popitem(last=False)
+        return result
+
+
+class CommandPhases(threading.local):
+    """Seconds the current thread's command spent fetching and parsing,
+    whether any fetch failed, and the items and lines _packreply sent.
+    Reset by MLB._runcommand."""
+
+    def __init__(self):
+        self.fetch, self.parse, self.failed = 0.0, 0.0, False
+        self.items, self.lines = 0, 0
+
+
+class PerfStats(object):
+    """Rolling per-command latency samples.
+
+    Each command keeps its last `samples` calls as (total, fetch, parse, render,
+    queue) seconds plus lifetime call and error counts. total is the run time;
+    queue is the wait on the command executor before that. It also adds up the
+    items packed into replies and the lines they took. Recording is an append under a
+    lock; percentiles are only computed when asked for.
+    """
+
+    phases = ('total', 'fetch', 'parse', 'render', 'queue')
+
+    def __init__(self, samples):
+        self._samples = samples
+        self._commands = {}  # command -> [calls, errors, deque of timings, items, lines]
+        self._lock = threading.Lock()
+
+    def record(self, command, timings, error, packed=(0, 0)):
+        """Add one call of command. timings is a tuple in self.phases order,
+        packed is (items, lines) from _packreply."""
+
+        with self._lock:
+            entry = self._commands.get(command)
+            if entry is None:
+                entry = self._commands[command] = [0, 0, collections.deque(maxlen=self._samples), 0, 0]
+            entry[0] += 1
+            if error:
+                entry[1] += 1
+            entry[2].append(timings)
+            entry[3] += packed[0]
+            entry[4] += packed[1]
+
+    def clear(self):
+        with self._lock:
+            self._commands.clear()
+
+    def summary(self):
+        """Return {command: {'calls', 'errors', 'items', 'lines', <phase>: (p50, p95, p99)}}.
+        Phases are in seconds."""
+
+        with self._lock:
+            snap = [(k, v[0], v[1], list(v[2]), v[3], v[4]) for (k, v) in self._commands.items()]
+        out = {}
+        for (command, calls, errors, samples, items, lines) in snap:
+            entry = {'calls': calls, 'errors': errors, 'items': items, 'lines': lines}
+            for (phase, values) in zip(self.phases, zip(*samples)):
+                values = sorted(values)
+                entry[phase] = tuple(values[min(len(values) - 1, int(p * len(values)))] for p in (0.50, 0.95, 0.99))
+            out[command] = entry
+        return out
+
+
+class PageBuffer(object):
+    """Reply lines that did not fit on the first page, kept per key for ttl
+    seconds so mlbmore can send them without running the command again."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}  # key -> (expires, deque of lines)
+        self._lock = threading.Lock()
+
+    def set(self, key, lines):
+        """Replace what is kept for key with lines. No lines drops it."""
+
+        now = time.time()
+        with self._lock:
+            for (k, (expires, rest)) in list(self._entries.items()):  # prune while we are here.
+                if expires < now:
+                    del self._entries[k]
+            if lines:
+                self._entries[key] = (now + self.ttl, collections.deque(lines))
+            else:
+                self._entries.pop(key, None)
+
+    def take(self, key, n):
+        """Return (up to n next lines for key, lines left after those). ([], 0) if none or expired."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if not entry or entry[0] < time.time():
+                self._entries.pop(key, None)
+                return ([], 0)
+            rest = entry[1]
+            out = [rest.popleft() for _ in range(min(n, len(rest)))]
+            if not rest:
+                del self._entries[key]
+            return (out, len(rest))
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CommandExecutor(object):
+    """Bounded pool of command threads with a fair queue.
+
+    Jobs are queued per target (the channel, or the nick in private) and the
+    workers take one job from each target in turn, so one busy channel can't
+    starve the others. The queue holds at most `depth` jobs and a user can have
+    at most `peruser` of them waiting; past that submit refuses the job.
+    A job that raises is logged to log; the worker carries on.
+    """
+
+    def __init__(self, workers, depth, peruser, log):
+        self.depth, self.peruser = depth, peruser
+        self.log = log
+        self.running, self.rejected = 0, 0
+        self._queues = collections.OrderedDict()  # target -> deque of (user, fn, args). next target first.
+        self._queued = 0
+        self._users = collections.defaultdict(int)  # user -> jobs waiting.
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._workers = []
+        for i in range(workers):
+            t = threading.Thread(target=self._work, name="MLB command worker #{0}".format(i))
+            t.setDaemon(True)
+            t.start()
+            self._workers.append(t)
+
+    def __len__(self):
+        return self._queued
+
+    def submit(self, target, user, fn, *args):
+        """Queue fn(*args) for target on behalf of user. False if the queue (or the user's share) is full."""
+
+        with self._cond:
+            if self._stopped or self._queued >= self.depth or self._users[user] >= self.peruser:
+                self.rejected += 1
+                return False
+            self._queues.setdefault(target, collections.deque()).append((user, fn, args))
+            self._queued += 1
+            self._users[user] += 1
+            self._cond.notify()
+        return True
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queued and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                (target, queue) = self._queues.popitem(last=False)
+                (user, fn, args) = queue.popleft()
+                if queue:  # back of the line for this target's next job.
+                    self._queues[target] = queue
+                self._queued -= 1
+                self._users[user] -= 1
+                if not self._users[user]:
+                    del self._users[user]
+                self.running += 1
+            try:
+                fn(*args)
+            except Exception:  # never lose the worker.
+                self.log.exception("Uncaught exception in a queued command.")
+            finally:
+                with self._cond:
+                    self.running -= 1
+
+    def stop(self):
+        """Drop whatever is queued and let the workers exit once their current job is done."""
+
+        with self._cond:
+            self._stopped = True
+            self._queues.clear()
+            self._queued = 0
+            self._users.clear()
+            self._cond.notify_all()
+
+    def join(self, timeout=None):
+        """Wait for the workers to exit after stop(). True if they all did."""
+
+        for t in self._workers:
+            t.join(timeout)
+        return True not in [t.isAlive() for t in self._workers]  # not any(): supybot.commands shadows it.
+
+
+class PlayerProfile(object):
+    """A player's ESPN pages parsed once and shared by the player commands.
+
+    The player page (name, bio, current or previous game) and the stats page
+    (season and career tables) are each parsed the first time a command needs
+    them, so the stats commands never wait on the player page.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.built = time.time()
+        self.loaded = False  # player page parsed.
+        self.name = None
+        self.bio = None
+        # dict: header, time, overview, away, home, colhead, row.
+        self.game = None
+        # dict: seasons ({year: [{column: stat}]}), career and averages ({column: stat}). None until loaded.
+        self.stats = None
+
+
+def textof(el, separator=''):
+    """Text of an lxml element as a utf-8 string. Each text node is stripped and joined by separator."""
+
+    if el is None:
+        return ''
+    return unicode(separator).join([t.strip() for t in el.itertext()]).encode('utf-8')
+
+
+def extractrows(page, specs):
+    """Parse page (bytes) and pull plain rows out of it. Runs in the parse pool, so it
+    must stay a module-level function with picklable arguments and result.
+
+    specs is {name: (rowpath, cellpath, grouppath)}. For each row matched by rowpath
+    the result has (group, [cell texts]) under name, where cells are matched by cellpath
+    under the row and group is the text of the first grouppath match (or None).
+    """
+
+    tree = html.document_fromstring(page, parser=html.HTMLParser(encoding='utf-8'))
+    out = {}
+    for (name, (rowpath, cellpath, grouppath)) in specs.items():
+        rows = []
+        for row in tree.xpath(rowpath):
+            group = row.xpath(grouppath) if grouppath else None
+            rows.append((textof(group[0]) if group else None, [textof(cell) for cell in row.xpath(cellpath)]))
+        out[name] = rows
+    return out
+
+
+def parseworkerinit():
+    """Parse pool worker start-up. Python 2 can only fork, so a worker starts as a copy of the
+    whole bot: drop the bot's signal handlers and close every inherited socket (IRC, HTTP) so
+    a worker never holds a connection open or shuts the bot down. The pool talks over pipes."""
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the bot stops us with terminate().
+    for sig in (signal.SIGTERM, signal.SIGHUP):
+        signal.signal(sig, signal.SIG_DFL)
+    try:
+        fds = [int(fd) for fd in os.listdir('/proc/self/fd')]
+    except OSError:  # no /proc.
+        fds = range(3, 1024)
+    for fd in fds:
+        try:
+            if fd > 2 and stat.S_ISSOCK(os.fstat(fd).st_mode):
+                os.close(fd)
+        except OSError:  # already gone (listdir's own fd).
+            pass
+
+
 @internationalizeDocstring
 class MLB(callbacks.Plugin):
     """Add the help for "@plugin help MLB" here
     This should describe *how* to use this plugin."""
-    threaded = True
+    threaded = False  # commands are queued on our own executor. see callCommand.
 
     def __init__(self, irc):
         self.__parent = super(MLB, self)
         self.__parent.__init__(irc)
         self._mlbdb = os.path.abspath(os.path.dirname(__file__)) + '/db/mlb.db'
+        # team tables are loaded once. see _teams.
+        self._teamregistry = TeamRegistry(self._mlbdb)
+        # our own data (history, players, ...) lives in the bot's data dir. mlb.db stays read-only.
+        self._datadb = conf.supybot.directories.data.dirize('MLB.db')
+        self._initdatadb()
+        # one pooled keep-alive session for every fetch. see _httpget.
+        self._session = self._httpsession()
+        # page cache in front of _httpget. TTL depends on the endpoint class (c).
+        self._pagecache = ResponseCache(self.registryValue('cache.maxBytes'))
+        # per-host circuit breakers. a host that keeps failing is skipped for a while.
+        self._health = HostHealth(self.registryValue('health.failures'), self.registryValue('health.cooldown'))
+        # identical fetches (by url) and parses (by command + args) in flight are coalesced.
+        self._httpflight = SingleFlight()
+        self._cmdflight = SingleFlight()
+        self._parsers = threading.local()
+        # commands run on a bounded, fair executor instead of a thread each. see callCommand.
+        self._executor = CommandExecutor(self.registryValue('executor.workers'), self.registryValue('executor.depth'), self.registryValue('executor.perUser'), self.log)
+        # per-command latency (see _runcommand). fetch/parse time is added up per thread.
+        self._phase = CommandPhases()
+        self._perf = PerfStats(self.registryValue('perf.samples'))
+        # packed reply lines past the first page, per (channel or nick, nick). see _packreply and mlbmore.
+        self._pages = PageBuffer(self.registryValue('pages.ttl'))
+        # bounded worker pool for commands that fetch several pages at once.
+        self._fetchpool = ThreadPool(self.registryValue('fetchWorkers'))
+        # worker processes for parsing big pages (see _parser and _extract). started on first use.
+        self._parsepool = None
+        self._parselock = threading.Lock()
+        # all-teams probables index. date -> (built, {team: [games]}). refreshed on a schedule.
+        self._probindex = {}
+        self._problock = threading.Lock()
+        schedule.addPeriodicEvent(self._refreshprobables, self.registryValue('probablesRefresh'), name='mlbprobables', now=False)
+        # scoreboard snapshot (built, {team: [gamecodes]}) and parsed box score pitching by gamecode.
+        self._scoreboardsnap = None
+        self._boxes = {}
+        self._boxlock = threading.Lock()
+        # standings snapshot (built, {division: [(team, gb)]}) with all six divisions and both wildcards.
+        self._standingssnap = None
+        # PlayerProfile by ESPN player url. see _playerprofile.
+        self._profiles = {}
+        self._profilelock = threading.Lock()
+        # parsed results (built, result) by url for the stale-while-revalidate commands. see _swr.
+        self._results = {}
+        self._refreshing = set()
+        self._resultlock = threading.Lock()
+        # player directory. loaded from the data db now and refreshed in the background.
+        self._players = self._loadplayers()
+        self._nameindex = NameIndex(self._players)
+        schedule.addPeriodicEvent(self._refreshplayers, self.registryValue('playersRefresh'), name='mlbplayers', now=not self._players)
+        schedule.addPeriodicEvent(self._refreshscoreboard, self.registryValue('scoreboard.refresh'), name='mlbscoreboard', now=False)
+        # background prefetch. its own small pool so it never holds up _fetchpool. see _prefetch.
+        self._active = 0  # interactive commands running. prefetch waits for them.
+        self._activelock = threading.Lock()
+        self._prefetchpool = ThreadPool(self.registryValue('prefetch.workers'))
+        self._prefetchlast, self._prefetchpending = {}, {}
+        self._prefetchlock = threading.Lock()
+        self._prefetchstop = threading.Event()
+        schedule.addPeriodicEvent(self._prefetch, 60, name='mlbprefetch', now=False)
 
     def die(self):
+        self._executor.stop()
+        self._prefetchstop.set()
+        for event in ('mlbprobables', 'mlbscoreboard', 'mlbplayers', 'mlbprefetch'):
+            try:
+                schedule.removePeriodicEvent(event)
+            except KeyError:
+                pass
+        self._prefetchpool.terminate()
+        self._fetchpool.terminate()
+        with self._parselock:
+            if self._parsepool:
+                self._parsepool.terminate()
+                self._parsepool.join()
+            self._parsepool = False  # no new pool once we are dying.
+        self._session.close()
         self.__parent.die()
 
+    # commands that never fetch anything. they run right away on the calling thread.
+    _inlinecommands = ('mlbcountdown', 'springtraining', 'mlbteams', 'mlbmore', 'mlbchanlineup', 'mlbhttp', 'mlbhosts', 'mlbforget', 'mlbperf')
+
+    def callCommand(self, command, irc, msg, *args, **kwargs):
+        """Queue the command on self._executor, or tell the user we're busy if the queue is full.
+        Limnoria holds a per-plugin lock around callCommand, so nothing slow may run in here."""
+
+        for cb in getattr(self, 'pre_command_callbacks', []):  # not any(): supybot.commands shadows it.
+            if cb(self, command, irc, msg, *args, **kwargs):
+                return
+        if command[-1] in self._inlinecommands:
+            self._runcommand(command, irc, msg, args, kwargs, None)
+            return
+        target = msg.args[0] if ircutils.isChannel(msg.args[0]) else msg.nick
+        if not self._executor.submit(target, msg.nick, self._runcommand, command, irc, msg, args, kwargs, time.time()):
+            irc.reply("Sorry, I'm busy right now. Try again in a minute.")
+
+    def _runcommand(self, command, irc, msg, args, kwargs, queued):
+        """Run command, timing it into self._perf: fetch, parse, render and, apart from
+        those, the time it waited in the queue since queued (None if it ran inline)."""
+
+        phase = self._phase
+        outer = (phase.fetch, phase.parse, phase.failed, phase.items, phase.lines)  # nested commands can run on the same thread.
+        phase.fetch, phase.parse, phase.failed, phase.items, phase.lines = 0.0, 0.0, False, 0, 0
+        error = True
+        with self._activelock:
+            self._active += 1
+        start = time.time()
+        try:
+            self.getCommandMethod(command)(irc, msg, *args, **kwargs)
+            error = phase.failed
+        except Exception as e:
+            if queued is None:  # inline. Limnoria's _callCommand handles it.
+                raise
+            self._commanderror(command, irc, msg, e)
+        finally:
+            total = time.time() - start
+            with self._activelock:
+                self._active -= 1
+            wait = start - queued if queued else 0.0
+            self._perf.record(' '.join(command), (total, phase.fetch, phase.parse, max(total - phase.fetch - phase.parse, 0.0), wait),
+                              error, (phase.items, phase.lines))
+            phase.fetch, phase.parse, phase.failed, phase.items, phase.lines = outer
+
+    def _commanderror(self, command, irc, msg, e):
+        """Reply to an exception from a queued command like Limnoria's _callCommand would have."""
+
+        if isinstance(e, callbacks.SilentError):
+            return
+        if isinstance(e, (getopt.GetoptError, callbacks.ArgumentError)):
+            irc.reply(self.getCommandHelp(command))
+        elif isinstance(e, callbacks.Error):
+            irc.error(str(e))
+        else:
+            self.log.exception("Uncaught exception in {0}.".format(' '.join(command)))
+            if conf.supybot.reply.error.detailed():
+                irc.error(utils.exnToString(e))
+            else:
+                irc.replyError(msg=msg)
+
     ##############
     # FORMATTING #
     ##############
@@ -78,23 +834,75 @@ class MLB(callbacks.Plugin):
     # INTERNAL FUNCTIONS #
     ######################
 
-    def _splicegen(self, maxchars, stringlist):
+    def _splicegen(self, maxchars, stringlist, separator=0):
         """Return a group of splices from a list based on the maxchars
-        string-length boundary.
+        string-length boundary. separator is the length of what goes
+        between two items. An item longer than maxchars gets a splice
+        of its own.
         """
 
         runningcount = 0
         tmpslice = []
         for i, item in enumerate(stringlist):
-            runningcount += len(item)
-            if runningcount <= int(maxchars):
+            size = len(item) + (separator if tmpslice else 0)
+            if runningcount + size <= int(maxchars) or not tmpslice:
                 tmpslice.append(i)
+                runningcount += size
             else:
                 yield tmpslice
                 tmpslice = [i]
                 runningcount = len(item)
         yield(tmpslice)
 
+    def _linelimit(self, irc, msg):
+        """Return the bytes of text that fit in one reply to msg: 512 less the
+        ':nick!user@host PRIVMSG target :' the server puts in front, the CRLF
+        and the 'nick: ' we may add. Uses supybot.reply.mores.length if set."""
+
+        length = conf.supybot.reply.mores.length()
+        if length:
+            return length
+        target = msg.args[0] if ircutils.isChannel(msg.args[0]) else msg.nick
+        # no prefix yet (or not a real irc): assume the longest user and host.
+        prefix = getattr(irc, 'prefix', None) or "{0}!{1}@{2}".format(getattr(irc, 'nick', ''), 'u' * 10, 'h' * 63)
+        return 512 - len(":{0} PRIVMSG {1} :\r\n".format(prefix, target)) - len(msg.nick) - len(": ")
+
+    def _pagekey(self, msg):
+        """Key of msg's page buffer: the channel (or nick in private) and the nick."""
+
+        target = msg.args[0] if ircutils.isChannel(msg.args[0]) else msg.nick
+        return (ircutils.toLower(target), ircutils.toLower(msg.nick))
+
+    def _packreply(self, irc, msg, items, prefix='', separator=" | ", suffix=''):
+        """Reply with items packed into as few lines as fit under _linelimit.
+        Every line starts with prefix; suffix goes on the last one. Items are
+        never split, so their color codes stay paired. Only the first
+        pages.lines lines are sent; the rest wait for mlbmore."""
+
+        items = [i.encode('utf-8') if isinstance(i, unicode) else i for i in items]
+        if not items:
+            return
+        # room for the "(N more: mlbmore)" _replypage may add too.
+        room = self._linelimit(irc, msg) - len(prefix) - len(suffix) - len(self._bold(" (99 more: mlbmore)"))
+        lines = [separator.join([items[i] for i in splice]) for splice in self._splicegen(room, items, len(separator))]
+        lines = [prefix + line for line in lines]
+        lines[-1] += suffix
+        # each item used to be a line. the difference is what mlbperf reports as saved.
+        self._phase.items += len(items)
+        self._phase.lines += len(lines)
+        # a new result replaces whatever mlbmore had left.
+        page = self.registryValue('pages.lines')
+        self._pages.set(self._pagekey(msg), lines[page:])
+        self._replypage(irc, lines[:page], len(lines) - page)
+
+    def _replypage(self, irc, lines, left):
+        """Send lines, telling how many are left for mlbmore on the last one."""
+
+        for (i, line) in enumerate(lines):
+            if i == len(lines) - 1 and left > 0:
+                line += " {0}".format(self._bold("({0} more: mlbmore)".format(left)))
+            irc.reply(line)
+
     def _batch(self, iterable, size):
         """http://code.activestate.com/recipes/303279/#c7"""
 
@@ -111,23 +919,211 @@ class MLB(callbacks.Plugin):
         except ValueError:
             return False
 
-    def _httpget(self, url, h=None, d=None, l=True):
-        """General HTTP resource fetcher. Pass headers via h, data via d, and to log via l."""
+    def _httpsession(self):
+        """Build the keep-alive session shared by every fetch.
+        Each host gets its own connection pool. urllib3 pools are thread-safe
+        so the command workers can share them."""
+
+        poolsize = self.registryValue('httpPoolSize')
+        session = requests.Session()
+        # pool_connections = number of hosts we keep pools for. pool_maxsize = sockets kept per host.
+        session.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=poolsize))
+        session.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=poolsize))
+        session.headers.update({'User-Agent': "Mozilla/5.0 (Windows NT 6.1; WOW64; rv:38.0) Gecko/20100101 Firefox/38.0"})
+        return session
+
+    def _httppools(self):
+        """Return a dict keyed by host with (requests, connections) from each keep-alive pool."""
+
+        pools = {}
+        for adapter in self._session.adapters.values():
+            container = adapter.poolmanager.pools
+            for key in container.keys():
+                pool = container.get(key)
+                if pool:  # pool could have been evicted in the meantime.
+                    pools[pool.host] = (pool.num_requests, pool.num_connections)
+        return pools
+
+    def _httpget(self, url, h=None, d=None, l=True, c=None):
+        """General HTTP resource fetcher. Pass headers via h, data via d, and to log via l.
+        Pass an endpoint class (static, leaders, live, box) via c to cache the page for
+        that class' TTL. Every fetch goes through the pooled session so connections are reused,
+        and concurrent GETs for the same url share one request."""
+
+        start = time.time()
+        if d:  # POSTs are never cached nor coalesced.
+            page = self._httpfetch(url, h, d, l, c)
+        else:  # only GETs with an endpoint class are cached.
+            page = self._pagecache.get(url) if c else None
+            if page is None:
+                page = self._httpflight.do(url, self._httpfetch, url, h, d, l, c)
+        # time spent here is the command's fetch phase. see _runcommand.
+        self._phase.fetch += time.time() - start
+        if page is None:
+            self._phase.failed = True
+        return page
+
+    def _httpfetch(self, url, h, d, l, c):
+        """Does the actual request for _httpget. Returns the body or None on error."""
 
         if self.registryValue('logURLs') and l:
             self.log.info(url)
 
+        mode = self.registryValue('fixtures.mode')
+        if mode != 'off':  # recorded responses for offline runs.
+            fixtures = FixtureStore(self.registryValue('fixtures.directory') or conf.supybot.directories.data.dirize('MLB-fixtures'))
+        if mode == 'replay':  # never touch the network.
+            fixture = fixtures.load(url, d)
+            if fixture is None:
+                self.log.error("ERROR opening {0} message: no recorded fixture".format(url))
+                return None
+            page = fixture[0]
+        else:
+            host = urlparse(url).hostname
+            if not self._health.allow(host):  # circuit is open. fail fast, or serve what we had.
+                self.log.info("Skipping {0} :: {1} is down".format(url, host))
+                return self._pagecache.get(url, stale=True) if c else None
+            start = time.time()
+            try:
+                timeout = self.registryValue('httpTimeout')
+                if d:  # we have data so POST.
+                    r = self._session.post(url, headers=h, data=d, timeout=timeout)
+                else:
+                    r = self._session.get(url, headers=h, timeout=timeout)
+                r.raise_for_status()
+                page = r.content
+            except Exception as e:
+                self.log.error("ERROR opening {0} message: {1}".format(url, e))
+                # a 4xx is the page's fault, not the host's.
+                response = getattr(e, 'response', None)
+                if response is not None and response.status_code < 500:
+                    self._health.success(host, time.time() - start)
+                    return None
+                self._health.failure(host, time.time() - start)
+                return self._pagecache.get(url, stale=True) if c else None
+            self._health.success(host, time.time() - start)
+            if mode == 'record':
+                try:
+                    fixtures.save(url, d, page, r.status_code, r.headers)
+                except (IOError, OSError) as e:
+                    self.log.error("ERROR recording {0} message: {1}".format(url, e))
+
+        if c and not d:
+            self._pagecache.set(url, page, self.registryValue('cache.{0}'.format(c)))
+        return page
+
+    def _swr(self, key, fn, *args):
+        """Stale-while-revalidate for parsed results. fn(*args) fetches and parses, returning None on error.
+        Results younger than swr.soft are served as they are. Older ones are served right away while one
+        background refresh runs. Past swr.hard we wait for a fresh result and only fall back to the old one
+        if that fails. Returns (result, age in seconds) or (None, None)."""
+
+        with self._resultlock:
+            entry = self._results.get(key)
+        age = time.time() - entry[0] if entry else None
+        if entry and age < self.registryValue('swr.soft'):
+            return (entry[1], age)
+        if entry and age < self.registryValue('swr.hard'):
+            with self._resultlock:
+                refresh = key not in self._refreshing
+                self._refreshing.add(key)
+            if refresh:  # only one refresh per key at a time.
+                self._fetchpool.apply_async(self._swrbackground, (key, fn) + args)
+            return (entry[1], age)
+        result = self._cmdflight.do(('swr', key), self._swrrefresh, key, fn, *args)
+        if result is None:
+            return (entry[1], age) if entry else (None, None)
+        return (result, 0)
+
+    def _swrrefresh(self, key, fn, *args):
+        """Run fn(*args) and store the result under key. Keys are urls, so the store stays small."""
+
         try:
-            if h and d:
-                page = utils.web.getUrl(url, headers=h, data=d)
-            else:
-                h = {"User-Agent": "Mozilla/5.0 (X11; Ubuntu; Linux i686; rv:17.0) Gecko/20100101 Firefox/17.0"}
-                h = {'User-Agent': "Mozilla/5.0 (Windows NT 6.1; WOW64; rv:38.0) Gecko/20100101 Firefox/38.0"}
-                page = utils.web.getUrl(url, headers=h)
-            return page
+            result = fn(*args)
+        finally:
+            with self._resultlock:
+                self._refreshing.discard(key)
+        if result is not None:
+            with self._resultlock:
+                self._results[key] = (time.time(), result)
+        return result
+
+    def _swrbackground(self, key, fn, *args):
+        """_swrrefresh for the fetch pool. Nobody reads an apply_async result, so log errors here."""
+
+        try:
+            self._swrrefresh(key, fn, *args)
+        except Exception:
+            self.log.exception("ERROR :: _swr :: background refresh of {0} failed".format(key))
+
+    def _staleness(self, age):
+        """Return a note to append to replies built from data older than swr.hard, else ''."""
+
+        if age is None or age < self.registryValue('swr.hard'):
+            return ''
+        return " " + self._yellow("(from {0} min ago)".format(int(age // 60)))
+
+    def _prefetchpage(self, url, c):
+        """Fetch url into the page cache for endpoint class c, even if a cached copy is still fresh."""
+
+        return self._httpflight.do(url, self._httpfetch, url, None, None, True, c)
+
+    # prefetch jobs. each has prefetch.<job>.interval/startHour/endHour settings.
+    _prefetchjobs = ('lineups', 'probables', 'standings', 'schedule', 'dailyleaders')
+
+    def _prefetchitems(self, job):
+        """Return the [(fn, args)] fetches that make up prefetch job."""
+
+        teams = self._teams().teams
+        if job == 'lineups':
+            return [(self._prefetchpage, (self._lineupurl(team), 'lineup')) for team in teams]
+        if job == 'probables':
+            return [(self._probablesindex, (eachdate, True)) for eachdate in self._probdates()]
+        if job == 'standings':
+            return [(self._cmdflight.do, (('standings',), self._buildstandings))]
+        if job == 'schedule':
+            return [(self._swrrefresh, (url, self._schedule, url)) for url in [self._scheduleurl(team) for team in teams]]
+        if job == 'dailyleaders':
+            return [(self._prefetchpage, (self._dailyleadersurl, 'leaders'))]
+        return []
+
+    def _prefetch(self):
+        """Scheduled every minute. Queue each prefetch job that is due (inside its hours, its interval
+        is up and its last run is done) on the prefetch pool. Never blocks the scheduler."""
+
+        now = time.time()
+        hour = datetime.datetime.now().hour
+        for job in self._prefetchjobs:
+            interval = self.registryValue('prefetch.{0}.interval'.format(job))
+            (start, end) = (self.registryValue('prefetch.{0}.startHour'.format(job)), self.registryValue('prefetch.{0}.endHour'.format(job)))
+            # startHour > endHour wraps around midnight.
+            inhours = (start <= hour < end) if start <= end else (hour >= start or hour < end)
+            if not interval or not inhours:
+                continue
+            with self._prefetchlock:
+                if self._prefetchpending.get(job) or self._prefetchlast.get(job, 0) + interval > now:
+                    continue
+                items = self._prefetchitems(job)
+                self._prefetchlast[job] = now
+                self._prefetchpending[job] = len(items)
+            for (fn, args) in items:
+                self._prefetchpool.apply_async(self._prefetchrun, (job, fn, args))
+
+    def _prefetchrun(self, job, fn, args):
+        """Run one prefetch fetch. Waits while interactive commands are running and
+        spaces fetches out by prefetch.delay so we don't hammer the sites."""
+
+        try:
+            while self._active and not self._prefetchstop.is_set():  # interactive commands go first.
+                self._prefetchstop.wait(0.25)
+            if not self._prefetchstop.is_set():
+                fn(*args)
+                self._prefetchstop.wait(self.registryValue('prefetch.delay'))
         except Exception as e:
-            self.log.error("ERROR opening {0} message: {1}".format(url, e))
-            return None
+            self.log.error("ERROR :: _prefetchrun :: {0} :: {1}".format(job, e))
+        finally:
+            with self._prefetchlock:
+                self._prefetchpending[job] -= 1
 
     def _b64decode(self, string):
         """Returns base64 decoded string."""
@@ -144,55 +1140,234 @@ class MLB(callbacks.Plugin):
             output = instring
         return output
 
+    ###################
+    # HTML EXTRACTION #
+    ###################
+
+    # row selectors shared by most of the ESPN tables. compiled once at load.
+    _rowsxp = etree.XPath('.//tr[starts-with(@class, "evenrow") or starts-with(@class, "oddrow")]')
+    _tdsxp = etree.XPath('.//td')
+    _statheadxp = etree.XPath('preceding::tr[@class="stathead"][1]')
+    # every other selector is compiled on first use and kept here.
+    _xpaths = {}
+
+    def _tree(self, page):
+        """Parse page (bytes) into an lxml document. Each thread keeps its own parser."""
+
+        start = time.time()
+        parser = getattr(self._parsers, 'parser', None)
+        if parser is None:
+            parser = self._parsers.parser = html.HTMLParser(encoding='utf-8')
+        tree = html.document_fromstring(page, parser=parser)
+        self._phase.parse += time.time() - start
+        return tree
+
+    def _xp(self, path):
+        """Return the compiled XPath for path."""
+
+        xp = self._xpaths.get(path)
+        if xp is None:
+            xp = self._xpaths[path] = etree.XPath(path)
+        return xp
+
+    def _find(self, el, path):
+        """First match of path under el or None."""
+
+        found = self._xp(path)(el)
+        return found[0] if found else None
+
+    def _findall(self, el, path):
+        """All matches of path under el."""
+
+        return self._xp(path)(el)
+
+    def _text(self, el, separator=''):
+        """Text of el as a utf-8 string. Each text node is stripped and joined by separator."""
+
+        return textof(el, separator)
+
+    def _parser(self):
+        """Return the parse pool, starting it the first time it is needed. None with parse.workers 0
+        (or once we are dying). Workers are spawned fresh where multiprocessing can; on Python 2
+        they are forked and cleaned up by parseworkerinit."""
+
+        workers = self.registryValue('parse.workers')
+        with self._parselock:
+            if self._parsepool is None and workers:
+                ctx = multiprocessing.get_context('spawn') if hasattr(multiprocessing, 'get_context') else multiprocessing
+                self._parsepool = ctx.Pool(workers, parseworkerinit)
+            return self._parsepool or None
+
+    def _extract(self, page, specs):
+        """extractrows(page, specs) for the CPU-heavy pages. Pages of parse.minBytes or more go to the
+        parse pool so concurrent commands don't serialize on the GIL; only the rows come back.
+        Smaller pages (or no pool, or a pool that doesn't answer in time) are parsed right here."""
+
+        start = time.time()
+        try:
+            pool = self._parser() if len(page) >= self.registryValue('parse.minBytes') else None
+            if pool:
+                try:
+                    return pool.apply_async(extractrows, (page, specs)).get(self.registryValue('httpTimeout'))
+                except multiprocessing.TimeoutError:
+                    self.log.error("ERROR :: _extract :: parse pool timed out. parsing in thread.")
+            return extractrows(page, specs)
+        finally:
+            self._phase.parse += time.time() - start
+
     ######################
     # DATABASE FUNCTIONS #
     ######################
 
+    def _teams(self):
+        """Return the TeamRegistry, reloading it if the db file changed on disk."""
+
+        registry = self._teamregistry
+        try:
+            mtime = os.path.getmtime(self._mlbdb)
+        except OSError:  # keep what we have.
+            return registry
+        if mtime != registry.mtime:
+            self.log.info("_teams :: {0} changed. Reloading team tables.".format(self._mlbdb))
+            registry = self._teamregistry = TeamRegistry(self._mlbdb)
+        return registry
+
     def _allteams(self):
         """Return a list of all valid teams (abbr)."""
 
-        with sqlite3.connect(self._mlbdb) as conn:
-            cursor = conn.cursor()
-            query = "SELECT team FROM mlb"
-            cursor.execute(query)
-            teamlist = [item[0] for item in cursor.fetchall()]
-
-        return " | ".join(sorted(teamlist))
+        return " | ".join(self._teams().teams)
 
     def _validteams(self, optteam):
         """Takes optteam as input function and sees if it is a valid team.
         Aliases are supported via mlbteamaliases table.
-        Returns a 1 upon error (no team name nor alias found.)
+        Returns None upon error (no team name nor alias found.)
         Returns the team's 3-letter (ex: NYY or ARI) if successful."""
 
-        with sqlite3.connect(self._mlbdb) as conn:
-            cursor = conn.cursor()
-            query = "SELECT team FROM mlbteamaliases WHERE teamalias=?"  # check aliases first.
-            cursor.execute(query, (optteam.lower(),))
-            aliasrow = cursor.fetchone()  # this will be None or the team (NYY).
-            if not aliasrow:  # person looking for team.
-                query = "SELECT team FROM mlb WHERE team=?"
-                cursor.execute(query, (optteam.upper(),))  # standard lookup. go upper. nyy->NYY.
-                teamrow = cursor.fetchone()
-                if not teamrow:  # team is not found. Error.
-                    returnval = None  # checked in each command.
-                else:  # ex: NYY
-                    returnval = str(teamrow[0])
-            else:  # alias turns into team like NYY.
-                returnval = str(aliasrow[0])
-        # return time.
-        return returnval
+        return self._teams().validate(optteam)
 
     def _translateTeam(self, db, column, optteam):
         """Translates optteam (validated via _validteams) into proper string using database column."""
 
-        with sqlite3.connect(self._mlbdb) as conn:
-            cursor = conn.cursor()
-            query = "SELECT %s FROM mlb WHERE %s=?" % (db, column)
-            cursor.execute(query, (optteam,))
-            row = cursor.fetchone()
+        return self._teams().translate(db, column, optteam)
+
+    def _teamlist(self, irc, optteams):
+        """Return the teams in optteams (teams, aliases or division codes, comma-separated).
+        Replies with the error and returns None if any are unknown or there are too many."""
+
+        registry = self._teams()
+        (teams, unknown) = registry.expand(optteams)
+        if unknown or not teams:
+            irc.reply("ERROR: Team not found: {0}. Valid teams are: {1}. Divisions: {2}".format(
+                ", ".join(unknown) or optteams, self._allteams(), " | ".join(registry.divisions.keys())))
+            return None
+        if len(teams) > self.registryValue('maxTeams'):
+            irc.reply("ERROR: I can only do {0} teams at once.".format(self.registryValue('maxTeams')))
+            return None
+        return teams
+
+    def _fanout(self, fn, teams, failed=None):
+        """Return [fn(team) for team in teams], run on _fetchpool so the slowest team sets the wait.
+        A team whose fn raises is logged and gets failed instead, so the others still reply.
+        fn must not wait on _fetchpool itself. Fetch and parse time on the workers is added to this
+        command's phases as the slowest team's, since the teams overlap. teams can be any keys
+        (mlbprob fans out over dates)."""
+
+        if len(teams) == 1:
+            return [self._fanoutrun(fn, teams[0], failed)]
+        results = self._fetchpool.map(lambda team: self._fanoutcall(fn, team, failed), teams)
+        phase = self._phase
+        phase.fetch += max([r[1] for r in results])
+        phase.parse += max([r[2] for r in results])
+        phase.failed = phase.failed or True in [r[3] for r in results]  # not any(): supybot.commands shadows it.
+        return [r[0] for r in results]
+
+    def _fanoutcall(self, fn, team, failed):
+        """Run fn(team) on a pool thread. Returns (result, fetch, parse, failed) of that thread's phases."""
+
+        phase = self._phase
+        phase.fetch, phase.parse, phase.failed = 0.0, 0.0, False
+        return (self._fanoutrun(fn, team, failed), phase.fetch, phase.parse, phase.failed)
+
+    def _fanoutrun(self, fn, team, failed):
+        """Return fn(team), or failed if it raises."""
+
+        try:
+            return fn(team)
+        except Exception as e:
+            self.log.exception("_fanout :: {0} failed: {1}".format(team, e))
+            self._phase.failed = True
+            return failed
+
+    def _initdatadb(self):
+        """Create our tables in the data db if they are not there yet."""
 
-        return (str(row[0]))
+        with sqlite3.connect(self._datadb) as conn:
+            cursor = conn.cursor()
+            # history. one row per season. year is the (indexed) primary key.
+            cursor.execute("""CREATE TABLE IF NOT EXISTS worldseries (
+                              year INTEGER PRIMARY KEY, winner TEXT, loser TEXT, series TEXT)""")
+            cursor.execute("""CREATE TABLE IF NOT EXISTS allstargame (
+                              year INTEGER PRIMARY KEY, score TEXT, location TEXT, venue TEXT, attendance TEXT, mvp TEXT)""")
+            # player directory. normname is the _sanitizeName of name.
+            cursor.execute("""CREATE TABLE IF NOT EXISTS players (
+                              id TEXT PRIMARY KEY, name TEXT, normname TEXT, team TEXT, pos TEXT)""")
+            # _pf name -> player page url. url is NULL when the search found nothing (negative).
+            cursor.execute("""CREATE TABLE IF NOT EXISTS playerurls (
+                              db TEXT, name TEXT, url TEXT, added INTEGER, PRIMARY KEY (db, name))""")
+            cursor.execute("""CREATE TABLE IF NOT EXISTS awards (
+                              year INTEGER PRIMARY KEY, almvp TEXT, nlmvp TEXT, alcy TEXT, nlcy TEXT,
+                              alroy TEXT, nlroy TEXT, almgr TEXT, nlmgr TEXT)""")
+        # (table, year) -> last time we went to the network to fill that gap.
+        self._historytried = {}
+        # (table, year) -> row of a season still in progress. served from here, never stored.
+        self._historypartial = {}
+
+    def _historyget(self, table, year=None):
+        """Return the row (sqlite3.Row) for year from history table or None.
+        Without a year, return the latest season we have."""
+
+        with sqlite3.connect(self._datadb) as conn:
+            conn.row_factory = sqlite3.Row
+            conn.text_factory = str  # utf-8 bytestrings like the rest of our output.
+            cursor = conn.cursor()
+            if year:
+                cursor.execute("SELECT * FROM %s WHERE year=?" % table, (year,))
+            else:
+                cursor.execute("SELECT * FROM %s ORDER BY year DESC LIMIT 1" % table)
+            return cursor.fetchone()
+
+    def _historyput(self, table, rows):
+        """Store rows (list of dicts with the table's columns) for seasons we do not have yet.
+        Recent rows (this season or last) with an empty field are a season still in progress;
+        they are kept in _historypartial instead, and _historygap goes back to the network for
+        them sooner. Older seasons can have real gaps (no award that year) and are stored as they are."""
+
+        recent = datetime.date.today().year - 1
+        partial = [row for row in rows if row['year'] >= recent and (None in row.values() or '' in row.values())]
+        rows = [row for row in rows if row not in partial]
+        for row in partial:
+            self._historypartial[(table, row['year'])] = row
+        for row in rows:
+            self._historypartial.pop((table, row['year']), None)
+        if not rows:
+            return
+        columns = sorted(rows[0].keys())
+        query = "INSERT OR IGNORE INTO %s (%s) VALUES (%s)" % (table, ",".join(columns), ",".join("?" * len(columns)))
+        with sqlite3.connect(self._datadb) as conn:
+            conn.executemany(query, [[row[c] for c in columns] for row in rows])
+
+    def _historygap(self, table, year):
+        """Return True if we should go to the network for a season of table we do not have.
+        Each gap is only tried once per cache.static seconds so bad years stay offline.
+        A season still in progress (see _historyput) is tried again after cache.leaders."""
+
+        now = time.time()
+        last = self._historytried.get((table, year))
+        window = self.registryValue('cache.leaders' if (table, year) in self._historypartial else 'cache.static')
+        if last and last > now - window:
+            return False
+        self._historytried[(table, year)] = now
+        return True
 
     ####################
     # PUBLIC FUNCTIONS #
@@ -238,6 +1413,118 @@ class MLB(callbacks.Plugin):
 
     mlbteams = wrap(mlbteams)
 
+    def mlbmore(self, irc, msg, args):
+        """
+        Display the next page of your last long reply in this channel.
+        Nothing is fetched again. Pages are kept for pages.ttl seconds.
+        """
+
+        (lines, left) = self._pages.take(self._pagekey(msg), self.registryValue('pages.lines'))
+        if not lines:
+            irc.reply("Nothing more to show. Pages are kept for {0} seconds.".format(self.registryValue('pages.ttl')))
+            return
+        self._replypage(irc, lines, left)
+
+    mlbmore = wrap(mlbmore)
+
+    def mlbhttp(self, irc, msg, args):
+        """
+        Display keep-alive connection reuse for each host we fetch from, page cache and coalescing counters.
+        """
+
+        pc = self._pagecache
+        out = ["{0} :: {1} pages ({2} bytes) | hits: {3} | misses: {4} | evictions: {5}".format(
+            self._red("PAGE CACHE"), len(pc), pc.size, pc.hits, pc.misses, pc.evictions)]
+        hf, cf = self._httpflight, self._cmdflight
+        out.append("{0} :: fetches: {1} coalesced of {2} | parses: {3} coalesced of {4}".format(
+            self._red("COALESCED"), hf.coalesced, hf.calls + hf.coalesced, cf.coalesced, cf.calls + cf.coalesced))
+        pools = self._httppools()
+        if pools:
+            # one entry per host. reused = requests that did not need a new connection.
+            hosts = []
+            for (host, (reqs, conns)) in sorted(pools.items()):
+                reused = max(reqs - conns, 0)
+                pct = (100.0 * reused / reqs) if reqs else 0.0
+                hosts.append("{0}: {1} req / {2} conn ({3:.0f}% reused)".format(self._bold(host), reqs, conns, pct))
+            out.append("{0} :: {1}".format(self._red("HTTP POOLS"), " | ".join(hosts)))
+        else:
+            out.append("No HTTP connections have been made yet.")
+        self._packreply(irc, msg, out, separator=" || ")
+
+    mlbhttp = wrap(mlbhttp, [('checkCapability', 'owner')])
+
+    def mlbhosts(self, irc, msg, args):
+        """
+        Display circuit state, average latency and error rate for each host we fetch from.
+        """
+
+        states = self._health.states()
+        if not states:
+            irc.reply("No HTTP requests have been made yet.")
+            return
+        out = []
+        for (host, entry) in sorted(states.items()):
+            state = entry['state'] if entry['state'] == 'closed' else self._red(entry['state'].upper())
+            latency = "{0:.0f}ms".format(entry['latency'] * 1000) if entry['latency'] is not None else "-"
+            out.append("{0}: {1} {2} {3:.0f}% err ({4} req, {5} failed, {6} skipped)".format(
+                self._bold(host), state, latency, entry['errorrate'] * 100, entry['requests'], entry['failures'], entry['fastfails']))
+        irc.reply("{0} :: {1}".format(self._red("HOSTS"), " | ".join(out)))
+
+    mlbhosts = wrap(mlbhosts, [('checkCapability', 'owner')])
+
+    def mlbforget(self, irc, msg, args, optlist, optplayer):
+        """[--db <e|r|s|br>] [player name]
+
+        Forget cached player page lookups. With no player name, forget all of them (for --db).
+        Ex: --db e Derek Jeter
+        """
+
+        db = None
+        for (option, arg) in optlist:
+            if option == 'db':
+                db = arg.lower()
+        if db and db not in ('e', 'r', 's', 'br'):
+            irc.reply("ERROR: db must be one of: e | r | s | br")
+            return
+        removed = self._pfcacheclear(db, optplayer)
+        irc.reply("Forgot {0} cached player page lookup(s).".format(removed))
+
+    mlbforget = wrap(mlbforget, [('checkCapability', 'owner'), getopts({'db': 'somethingWithoutSpaces'}), optional('text')])
+
+    def mlbperf(self, irc, msg, args, optlist):
+        """[--reset] [--top <n>]
+
+        Display the slowest commands by p95 latency, with p50/p95/p99, the split between
+        fetch, parse and render, the time spent queued and the reply lines saved by packing.
+        Covers the last perf.samples calls of each command. Use --reset to start over.
+        """
+
+        top = 5
+        for (option, arg) in optlist:
+            if option == 'reset':
+                self._perf.clear()
+                irc.reply("Command timings reset.")
+                return
+            if option == 'top':
+                top = arg
+        ex = self._executor
+        out = ["{0} :: {1} running | {2} queued (max {3}) | {4} turned away".format(
+            self._red("EXECUTOR"), ex.running, len(ex), ex.depth, ex.rejected)]
+        summary = self._perf.summary()
+        if not summary:
+            out.append("No commands have been timed yet.")
+        ms = lambda t: "{0:.0f}".format(t * 1000)
+        for (command, entry) in sorted(summary.items(), key=lambda x: x[1]['total'][1], reverse=True)[:top]:
+            total = entry['total']
+            err = 100.0 * entry['errors'] / entry['calls']
+            phases = ", ".join(["{0} {1}/{2}".format(phase, ms(entry[phase][0]), ms(entry[phase][1])) for phase in ('fetch', 'parse', 'render', 'queue')])
+            saved = " :: {0} of {1} lines saved".format(entry['items'] - entry['lines'], entry['items']) if entry['items'] else ''
+            out.append("{0} :: {1} calls, {2:.0f}% errors :: p50/p95/p99 {3}/{4}/{5}ms :: p50/p95 {6}{7}".format(
+                self._bold(command), entry['calls'], err, ms(total[0]), ms(total[1]), ms(total[2]), phases, saved))
+        self._packreply(irc, msg, out, separator=" || ")
+
+    mlbperf = wrap(mlbperf, [('checkCapability', 'owner'), getopts({'reset': '', 'top': 'positiveInt'})])
+
     def mlbchanlineup(self, irc, msg, args):
         """
         Display a random lineup for channel users.
@@ -264,6 +1551,91 @@ class MLB(callbacks.Plugin):
 
     mlbchanlineup = wrap(mlbchanlineup)
 
+    def _buildscoreboard(self):
+        """Fetch the scoreboard and build the {team: [gamecodes]} index. Returns None on error.
+        Doubleheaders give a team more than one gamecode, in scoreboard order."""
+
+        url = "http://scores.nbcsports.com/mlb/scoreboard.asp"
+        page = self._httpget(url, c='live')
+        if not page:
+            return None
+        # process scoreboard. each "game" is a linescore table with two teams.
+        tree = self._tree(page)
+        index = collections.defaultdict(list)
+        for game in tree.xpath('//table[contains(@class, "shsLinescore")]'):
+            links = game.xpath('.//span[contains(@class, "shsPreviewLink")]//a/@href')
+            if not links:
+                continue
+            gid = "".join(re.findall(r'\d+', links[-1]))
+            for tn in game.xpath('.//a[contains(@class, "teamName")]/text()'):
+                try:
+                    team = self._translateTeam('team', 'yname', tn.strip())
+                except KeyError:
+                    self.log.info("ERROR :: _buildscoreboard :: unknown team {0}".format(tn))
+                    continue
+                if gid not in index[team]:
+                    index[team].append(gid)
+        self._scoreboardsnap = (time.time(), dict(index))
+        return dict(index)
+
+    def _scoreboard(self):
+        """Return the scoreboard snapshot {team: [gamecodes]}, rebuilding it when older than
+        scoreboard.refresh. Concurrent rebuilds are coalesced. None if we have nothing."""
+
+        snap = self._scoreboardsnap
+        if snap and snap[0] > time.time() - self.registryValue('scoreboard.refresh'):
+            return snap[1]
+        index = self._cmdflight.do(('scoreboard',), self._buildscoreboard)
+        if index is None and snap:  # keep serving the last one we had.
+            return snap[1]
+        return index
+
+    def _refreshscoreboard(self):
+        """Scheduled. Rebuild the scoreboard snapshot in the background during game hours."""
+
+        if self.registryValue('scoreboard.startHour') <= datetime.datetime.now().hour < self.registryValue('scoreboard.endHour'):
+            self._fetchpool.apply_async(self._cmdflight.do, (('scoreboard',), self._buildscoreboard))
+
+    def _boxpitching(self, gamecode):
+        """Return (final, {team: [(pitcher, [(column, stat)])]}) from the box score for gamecode
+        or None on error. Cached with a short TTL while the game is live and a long one once final."""
+
+        now = time.time()
+        with self._boxlock:
+            entry = self._boxes.get(gamecode)
+        if entry and entry[0] > now:
+            return entry[1]
+        url = "http://scores.nbcsports.com/mlb/boxscore.asp?gamecode=" + gamecode
+        page = self._httpget(url, c='live')
+        if not page:
+            return None
+        tree = self._tree(page)
+        # the linescore header reads Final once the game is over.
+        final = 'Final' in tree.xpath('string((//table[contains(@class, "shsLinescore")]//tr)[1])')
+        # grab relevant pitching tables. last two.
+        pitching = collections.defaultdict(list)
+        for ptable in tree.xpath('//table[contains(@class, "shsBorderTable")]')[-2:]:
+            try:  # translate the team.
+                team = self._translateTeam('team', 'fulltrans', ptable.xpath('string(.//td[contains(@class, "shsNamD")])').strip())
+            except KeyError:
+                continue
+            colhead = [td.text_content().strip() for td in ptable.xpath('.//tr[contains(@class, "shsColTtlRow")][1]/td')]
+            for row in ptable.xpath('.//tr[contains(@class, "Row") and starts-with(@class, "shsRow")]'):
+                tds = row.xpath('./td')
+                if not tds:
+                    continue
+                pname = tds[0].text_content().split(',', 1)[0].strip()
+                stats = [(colhead[k+1], z.text_content().strip()) for (k, z) in enumerate(row.xpath('./td[contains(@class, "shsNumD")]')) if k+1 < len(colhead)]
+                pitching[team].append((pname, stats))
+        result = (final, dict(pitching))
+        ttl = self.registryValue('scoreboard.finalBoxTTL') if final else self.registryValue('cache.box')
+        with self._boxlock:
+            for (k, v) in self._boxes.items():  # prune while we are here.
+                if v[0] < now:
+                    del self._boxes[k]
+            self._boxes[gamecode] = (now + ttl, result)
+        return result
+
     def mlbpitcher(self, irc, msg, args, optteam):
         """<team>
         Displays current pitcher(s) and stats in active or previous game for team.
@@ -274,78 +1646,56 @@ class MLB(callbacks.Plugin):
         if not optteam:  # team is not found in aliases or validteams.
             irc.reply("ERROR: Team not found. Valid teams are: {0}".format(self._allteams()))
             return
-        # build url and fetch scoreboard.
-        url = "http://scores.nbcsports.com/mlb/scoreboard.asp"
-        html = self._httpget(url)
-        if not html: 
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
+        # the scoreboard snapshot maps team to gamecode(s).
+        scoreboard = self._scoreboard()
+        if scoreboard is None:
+            irc.reply("ERROR: Failed to fetch the scoreboard.")
             return
-        # process scoreboard.
-        soup = BeautifulSoup(html)
-        games = soup.select('table.shsTable.shsLinescore')
-        # container to put all of the teams in.
-        teamdict = collections.defaultdict(list)
-        # process each "game" (two teams in each)
-        for game in games:
-            tns = game.find_all('a', class_='teamName')
-            if tns:
-                for n in tns:
-                    tn = str(n.getText())
-                    try:
-                        gid = game.select('span.shsPreviewLink')
-                        for g in gid:
-                            gid = g.find('a', href=True)
-                            gid = str(re.findall('\d+', gid['href'])).strip('\'[]')
-                        tn = self._translateTeam('team', 'yname', tn)
-                        teamdict[tn].append(gid)
-                    except Exception as e:
-                        self.log.info("ERROR :: mlbpitcher :: {0}".format(e))
-                        pass
-        # grab the gameid. fetch.
-        teamgameids = teamdict.get(optteam)
+        teamgameids = scoreboard.get(optteam)
         # sanity check before we grab the game.
         if not teamgameids:
             irc.reply("ERROR: No upcoming/active games with: {0}. Check closer to gametime.".format(optteam))
             return
-        # TBD how to handle more than one game per team per day (doubleheaders)
-        # if len(teamgameids) > 1:  # we have a doubleheader
-        # fetch the game, for now will only fetch game 1 of a doubleheader
-        url = "http://scores.nbcsports.com/mlb/boxscore.asp?gamecode=" + teamgameids[0]
-        html = self._httpget(url)
-        if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
+        # doubleheaders: show game 1 until we know it is final, then game 2.
+        box = self._boxpitching(teamgameids[0])
+        if box and box[0] and len(teamgameids) > 1:
+            box = self._boxpitching(teamgameids[1])
+        if not box:
+            irc.reply("ERROR: Failed to fetch the box score for {0}.".format(optteam))
             return
-        soup = BeautifulSoup(html)
-        # grab relevant pitching tables
-        pitching = soup.select('table.shsTable.shsBorderTable')
-        pitching = pitching[-2:]
-        if not pitching:
+        output = box[1].get(optteam)
+        if not output:
             irc.reply("ERROR: I could not find pitching. Use command once game is active/finished.")
             return
-        # process tables
-        p = collections.defaultdict(list)
-        for ptable in pitching:
-            team = ptable.find('td', class_='shsNamD').getText()
-            # translate the team.
-            team = self._translateTeam('team', 'fulltrans', team)
-            colhead = ptable.find('tr', class_='shsColTtlRow').find_all('td')
-            cols = ptable.find_all('tr', attrs={'class': re.compile('shsRow\dRow')})
-            t = []
-            for col in cols:
-                # extract name and stats. format for legibility
-                pname = "{0} {1}".format(self._bold(self._blue(col.find('td').getText().split(',',1)[0])),'[')
-                rest = " ".join([self._bold(colhead[k+1].getText()) + ": " + \
-                                z.getText() for (k, z) in enumerate(col.find_all('td', class_='shsNumD'))])
-                p[team].append("{0} {1} {2}".format(pname, rest, "]"))
-        # output
-        output = p.get(optteam)
-        for item in output:
-            irc.reply("{0}".format(item))
+        # extract name and stats. format for legibility
+        out = []
+        for (pname, stats) in output:
+            rest = " ".join([self._bold(col) + ": " + stat for (col, stat) in stats])
+            out.append("{0} [ {1} ]".format(self._bold(self._blue(pname)), rest))
+        self._packreply(irc, msg, out, separator=" ")
 
     mlbpitcher = wrap(mlbpitcher, [('somethingWithoutSpaces')])
 
+    def _fetchworldseries(self):
+        """Fetch and parse the World Series history page. Returns a list of dicts (one per year) or None."""
+
+        url = self._b64decode('aHR0cDovL2VzcG4uZ28uY29tL21sYi93b3JsZHNlcmllcy9oaXN0b3J5L3dpbm5lcnM=')
+        html = self._httpget(url, c='static')
+        if not html:
+            return None
+        # process html.
+        tree = self._tree(html)
+        rows = self._rowsxp(tree)
+        worldseries = []
+        # each year is a worldseries.
+        for row in rows:
+            tds = self._tdsxp(row)
+            worldseries.append({'year': int(self._text(tds[0])),
+                                'winner': utils.str.normalizeWhitespace(self._text(tds[1])),
+                                'loser': utils.str.normalizeWhitespace(self._text(tds[2])),
+                                'series': self._text(tds[3])})
+        return worldseries
+
     def mlbworldseries(self, irc, msg, args, optyear):
         """<YYYY>
         Display results for a MLB World Series that year. Earliest year is 1903 and latest is the last postseason.
@@ -357,37 +1707,43 @@ class MLB(callbacks.Plugin):
         if not testdate:
             irc.reply("ERROR: Invalid year. Must be YYYY.")
             return
-        # build and fetch url.
-        url = self._b64decode('aHR0cDovL2VzcG4uZ28uY29tL21sYi93b3JsZHNlcmllcy9oaXN0b3J5L3dpbm5lcnM=')
-        html = self._httpget(url)
-        if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
-            return
-        # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        rows = soup.findAll('tr', attrs={'class': re.compile('^evenrow|^oddrow')})
-        # dict for output container. key=year.
-        worldseries = collections.defaultdict(list)
-        # each year is a worldseries.
-        for row in rows:
-            tds = row.findAll('td')
-            year = tds[0]
-            winner = tds[1].getText()
-            loser = tds[2].getText()
-            series = tds[3].getText()
-            worldseries[int(year.getText())] = "Winner: {0}  Loser: {1}  Series: {2}".format(\
-                self._bold(utils.str.normalizeWhitespace(winner)), utils.str.normalizeWhitespace(loser), series)
+        # answer from the store. only go to the network for seasons we do not have yet.
+        ws = self._historyget('worldseries', optyear)
+        if not ws and 1903 <= optyear <= datetime.date.today().year and self._historygap('worldseries', optyear):
+            rows = self._fetchworldseries()
+            if rows is None:
+                irc.reply("ERROR: Failed to fetch World Series history.")
+                return
+            self._historyput('worldseries', rows)
+            ws = self._historyget('worldseries', optyear)
         # prepare to output.
-        outyear = worldseries.get(optyear)
-        if not outyear:  # if we don't have a year..
+        if not ws:  # if we don't have a year..
             irc.reply("ERROR: I could not find MLB World Series information for: {0}".format(optyear))
             return
         else:  # we have the world series.
-            irc.reply("{0} World Series :: {1}".format(self._red(optyear), outyear))
+            irc.reply("{0} World Series :: Winner: {1}  Loser: {2}  Series: {3}".format(
+                self._red(optyear), self._bold(ws['winner']), ws['loser'], ws['series']))
 
     mlbworldseries = wrap(mlbworldseries, [('int')])
 
+    def _fetchallstargames(self):
+        """Fetch and parse the All-Star Game history page. Returns a list of dicts (one per year) or None."""
+
+        url = self._b64decode('aHR0cDovL2VzcG4uZ28uY29tL21sYi9hbGxzdGFyZ2FtZS9oaXN0b3J5')
+        html = self._httpget(url, c='static')
+        if not html:
+            return None
+        # process html.
+        tree = self._tree(html)
+        rows = self._rowsxp(tree)
+        allstargames = []
+        # each row is an allstar game.
+        for row in rows:
+            tds = [self._text(item) for item in self._tdsxp(row)]
+            allstargames.append({'year': int(tds[0]), 'score': tds[1], 'location': tds[2],
+                                 'venue': tds[3], 'attendance': tds[4], 'mvp': tds[5]})
+        return allstargames
+
     def mlballstargame(self, irc, msg, args, optyear):
         """<YYYY>
         Display results for that year's MLB All-Star Game. Ex: 1996. Earliest year is 1933 and latest is this season.
@@ -398,29 +1754,22 @@ class MLB(callbacks.Plugin):
         if not testdate:
             irc.reply("ERROR: Invalid year. Must be YYYY.")
             return
-        # build and fetch url.
-        url = self._b64decode('aHR0cDovL2VzcG4uZ28uY29tL21sYi9hbGxzdGFyZ2FtZS9oaXN0b3J5')
-        html = self._httpget(url)
-        if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
-            return
-        # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        rows = soup.findAll('tr', attrs={'class': re.compile('^evenrow|^oddrow')})
-        # k/v dict container for output. k = year.
-        allstargames = collections.defaultdict(list)
-        # each row is an allstar game.
-        for row in rows:
-            tds = [item.getText() for item in row.findAll('td')]
-            allstargames[int(tds[0])] = "Score: {0}  Location: {1}({2})  Att: {3}  MVP: {4}  ".format(tds[1], tds[2], tds[3], tds[4], tds[5])
+        # answer from the store. only go to the network for seasons we do not have yet.
+        asg = self._historyget('allstargame', optyear)
+        if not asg and 1933 <= optyear <= datetime.date.today().year and self._historygap('allstargame', optyear):
+            rows = self._fetchallstargames()
+            if rows is None:
+                irc.reply("ERROR: Failed to fetch All-Star Game history.")
+                return
+            self._historyput('allstargame', rows)
+            asg = self._historyget('allstargame', optyear)
         # prepare to output.
-        outyear = allstargames.get(optyear)
-        if not outyear:  # nothing in the years.
+        if not asg:  # nothing in the years.
             irc.reply("ERROR: I could not find MLB All-Star Game information for: {0}".format(optyear))
             return
         else:  # we do have a year/game.
-            irc.reply("{0} All-Star Game :: {1}".format(self._red(optyear), outyear))
+            irc.reply("{0} All-Star Game :: Score: {1}  Location: {2}({3})  Att: {4}  MVP: {5}  ".format(
+                self._red(optyear), asg['score'], asg['location'], asg['venue'], asg['attendance'], asg['mvp']))
 
     mlballstargame = wrap(mlballstargame, [('int')])
 
@@ -431,25 +1780,24 @@ class MLB(callbacks.Plugin):
 
         # build and fetch URL.
         url = self._b64decode('aHR0cDovL2VzcG4uZ28uY29tL21sYi9mZWF0dXJlcy9jeXlvdW5n')
-        html = self._httpget(url)
+        html = self._httpget(url, c='leaders')
         if not html:
             irc.reply("ERROR: Failed to fetch {0}.".format(url))
             self.log.error("ERROR opening {0}".format(url))
             return
         # now process HTML.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        players = soup.findAll('tr', attrs={'class': re.compile('(^oddrow.*?|^evenrow.*?)')})
+        tree = self._tree(html)
+        players = self._rowsxp(tree)
         # k/v container for output. key = league (al/nl), values = players.
         cyyoung = collections.defaultdict(list)
         # process each row(player).
         for player in players:
-            colhead = player.findPrevious('tr', attrs={'class': 'stathead'})
-            tds = [item.getText() for item in player.findAll('td')]
+            colhead = self._statheadxp(player)
+            tds = [self._text(item) for item in self._tdsxp(player)]
             appendString = "{0}. {1}".format(tds[0], tds[1], tds[2])
-            cyyoung[str(colhead.getText())].append(appendString)  # now append.
+            cyyoung[self._text(colhead[0]) if colhead else ''].append(appendString)  # now append.
         # output time.
-        for i, x in cyyoung.iteritems():
-            irc.reply("{0} :: {1}".format(self._red(i), " | ".join([item for item in x])))
+        self._packreply(irc, msg, ["{0} :: {1}".format(self._red(i), " | ".join([item for item in x])) for (i, x) in cyyoung.iteritems()], separator=" || ")
 
     mlbcyyoung = wrap(mlbcyyoung)
 
@@ -466,9 +1814,8 @@ class MLB(callbacks.Plugin):
             self.log.error("ERROR opening {0}".format(url))
             return
         # process html.
-        #soup = BeautifulSoup(html)
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        ars = soup.findAll('h2', attrs={'class': 'blog-title'})
+        tree = self._tree(html)
+        ars = self._findall(tree, '//h2[@class="blog-title"]')
         if len(ars) == 0:
             irc.reply("No arrests found. Something break?")
             return
@@ -476,11 +1823,11 @@ class MLB(callbacks.Plugin):
             az = []  # empty list for arrests.
             # iterate over each and inject to list.
             for ar in ars[0:5]:  # iterate over each.
-                ard = ar.findNext('div', attrs={'class': 'blog-date'})
+                ard = self._find(ar, 'following::div[@class="blog-date"][1]')
                 # text and cleanup.
-                ard = ard.getText().replace('Posted On', '')
+                ard = self._text(ard).replace('Posted On', '')
                 # print.
-                az.append({'d': ard, 'a': ar.getText()})
+                az.append({'d': ard, 'a': self._text(ar)})
         # now lets create our output.
         delta = datetime.datetime.strptime(str(az[0]['d']), "%B %d, %Y").date() - datetime.date.today()
         daysSince = abs(delta.days)
@@ -489,6 +1836,22 @@ class MLB(callbacks.Plugin):
 
     mlbarrests = wrap(mlbarrests)
 
+    def _roster(self, url):
+        """Fetch and parse the roster page at url into [(position group, ["player (pos)"])]. None on error."""
+
+        html = self._httpget(url)
+        if not html:
+            return None
+        rows = self._extract(html, {'players': ('(//div[@class="mod-content"]//table[@class="tablehead"])[1]'
+                                                '//tr[starts-with(@class, "oddrow player") or starts-with(@class, "evenrow player")]',
+                                                './/td', 'preceding::tr[@class="stathead"][1]')})
+        # k/v container for output. groups stay in page order.
+        team_data = collections.OrderedDict()
+        # each row is a player (number, name, position), in a table of position.
+        for (playerType, tds) in rows['players']:
+            team_data.setdefault(playerType, []).append("{0} ({1})".format(tds[1], tds[2]))
+        return team_data.items()
+
     def mlbroster(self, irc, msg, args, optlist, optteam):
         """[--40man|--active] <team>
         Display active roster for team.
@@ -513,28 +1876,17 @@ class MLB(callbacks.Plugin):
             url = self._b64decode('aHR0cDovL2VzcG4uZ28uY29tL21sYi90ZWFtL3Jvc3Rlci9fL25hbWU=') + '/%s/type/active/' % optteam.lower()
         else:  # 40man
             url = self._b64decode('aHR0cDovL2VzcG4uZ28uY29tL21sYi90ZWFtL3Jvc3Rlci9fL25hbWU=') + '/%s/' % optteam.lower()
-        # fetch url.
-        html = self._httpget(url)
-        if not html:
+        # fetch and parse url. served from _swr when we have it.
+        (team_data, age) = self._swr(url, self._roster, url)
+        if team_data is None:
             irc.reply("ERROR: Failed to fetch {0}.".format(url))
             self.log.error("ERROR opening {0}".format(url))
             return
-        # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        table = soup.find('div', attrs={'class': 'mod-content'}).find('table', attrs={'class':'tablehead'})
-        rows = table.findAll('tr', attrs={'class': re.compile('^oddrow player.*|^evenrow player.*')})
-        # k/v container for output.
-        team_data = collections.defaultdict(list)
-        # each row is a player, in a table of position.
-        for row in rows:
-            playerType = row.findPrevious('tr', attrs={'class': 'stathead'})
-            playerNum = row.find('td')
-            playerName = playerNum.findNext('td').find('a')
-            playerPos = playerName.findNext('td')
-            team_data[playerType.getText()].append("{0} ({1})".format(playerName.getText(), playerPos.getText()))
-        # output time.
-        for i, j in team_data.iteritems():  # output one line per position.
-            irc.reply("{0} {1} :: {2}".format(self._red(optteam.upper()), self._bold(i), " | ".join([item for item in j])))
+        # output time. one item per player; the first of each position carries its name.
+        out = []
+        for i, j in team_data:
+            out.extend(["{0}: {1}".format(self._bold(i), j[0])] + j[1:])
+        self._packreply(irc, msg, out, prefix="{0} :: ".format(self._red(optteam.upper())), suffix=self._staleness(age))
 
     mlbroster = wrap(mlbroster, [getopts({'active': '', '40man': ''}), ('somethingWithoutSpaces')])
 
@@ -572,49 +1924,85 @@ class MLB(callbacks.Plugin):
             self.log.info("_hs: ERROR trying to format: {0} :: {1}".format(s, e))
             return s
 
-    def mlbpayroll(self, irc, msg, args, optteam):
-        """<team>
-        Display payroll situation for <team>.
-        Ex: NYY
-        """
+    def _payrollurl(self, team):
+        """Return the payroll page url for team (NYY)."""
 
-        # test for valid teams.
-        optteam = self._validteams(optteam)
-        if not optteam:  # team is not found in aliases or validteams.
-            irc.reply("ERROR: Team not found. Valid teams are: {0}".format(self._allteams()))
-            return
-        # need to translate team for the url
-        lookupteam = self._translateTeam('st', 'team', optteam)
-        # fetch url.
-        url = self._b64decode('aHR0cDovL3d3dy5zcG90cmFjLmNvbS9tbGIv') + '%s/payroll/' % lookupteam
+        lookupteam = self._translateTeam('st', 'team', team)  # need to translate team for the url
+        return self._b64decode('aHR0cDovL3d3dy5zcG90cmFjLmNvbS9tbGIv') + '%s/payroll/' % lookupteam
+
+    def _payroll(self, team):
+        """Fetch and parse team's payroll into "title :: cap total | ..." or None on error."""
+
+        url = self._payrollurl(team)
         html = self._httpget(url)
         if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
             self.log.error("ERROR opening {0}".format(url))
-            return
+            return None
         # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        teamtitle = soup.find('title').getText().split('|')[0].strip()
+        tree = self._tree(html)
+        teamtitle = self._text(self._find(tree, '//title')).split('|')[0].strip()
         # we dont check this below because we want to know when it breaks.
-        table = soup.find('table', attrs={'class': 'datatable captotal xs-hide'})
-        #irc.reply("{0}".format(table.getText()))
+        table = self._find(tree, '//table[@class="datatable captotal xs-hide"]')
         # quick and dirt, grab the last row.
-        rows = table.findAll('tr')[-1:]
+        tds = self._tdsxp(self._findall(table, './/tr')[-1])
         # this row will have 4 TD in them. First is blank, second is base salary, signing bonus, incentives, captotal.
-        basesalary = rows[0].findAll('td')[1].getText()
-        signingbonus = rows[0].findAll('td')[2].getText()
-        incentives = rows[0].findAll('td')[3].getText()
-        captotal = rows[0].findAll('td')[4].getText()
+        basesalary = self._text(tds[1])
+        signingbonus = self._text(tds[2])
+        incentives = self._text(tds[3])
+        captotal = self._text(tds[4])
         # format them.
         basesalary = self._hs(basesalary)
         signingbonus = self._hs(signingbonus)
         incentives = self._hs(incentives)
         captotal = self._hs(captotal)
+        return "{0} :: {1} | Base Salaries: {2} | Signing Bonuses: {3} | Incentives: {4}".format(self._bold(teamtitle), captotal, basesalary, signingbonus, incentives)
+
+    def mlbpayroll(self, irc, msg, args, optteam):
+        """<team[,team...]|division>
+        Display payroll situation for <team>, several teams or a division.
+        Ex: NYY or NYY,BOS or ALE
+        """
+
+        # test for valid teams.
+        teams = self._teamlist(irc, optteam)
+        if not teams:
+            return
+        # one fetch per team, all at once.
+        payrolls = self._fanout(self._payroll, teams)
+        if len(teams) == 1 and not payrolls[0]:
+            irc.reply("ERROR: Failed to fetch {0}.".format(self._payrollurl(teams[0])))
+            return
         # output
-        irc.reply("{0} :: {1} | Base Salaries: {2} | Signing Bonuses: {3} | Incentives: {4}".format(self._bold(teamtitle), captotal, basesalary, signingbonus, incentives))
+        out = [p or "{0} :: failed to fetch.".format(self._bold(team)) for (team, p) in zip(teams, payrolls)]
+        self._packreply(irc, msg, out, separator=" || ")
 
     mlbpayroll = wrap(mlbpayroll, [('somethingWithoutSpaces')])
 
+    def _leaders(self, url):
+        """Fetch and parse the league leaders page at url into (results, ["rank. player (stat)"]).
+        results is False when the site has no results for the query. None on error."""
+
+        html = self._httpget(url, c='leaders')
+        if not html:
+            return None
+        # sanity check before we can process html.
+        if 'No results available based on the selected criteria.' in html:
+            return (False, [])
+        # process HTML.
+        tree = self._tree(html)
+        table = self._find(tree, '//table[@class="table" and @width="100%" and @cellspacing="0"]')
+        trs = self._findall(table, './/tr')[1:]  # skip the header row.
+        # container for the output.
+        mlbstats = []
+        # process the rows
+        for tr in trs:
+            tds = self._tdsxp(tr)
+            rk = self._text(tds[0])
+            plr = self._text(tds[1])
+            st = self._text(tds[2])
+            mlbstats.append("{0}. {1} ({2})".format(rk, plr, st))
+        return (True, mlbstats)
+
     def mlbleaders(self, irc, msg, args, optlist, optleague, optstat):
         """<mlb|nl|al> <statname>
 
@@ -655,35 +2043,22 @@ class MLB(callbacks.Plugin):
         # now we build URL.
         url = b64decode('aHR0cDovL20uZXNwbi5nby5jb20vbWxiL2xlYWd1ZWxlYWRlcnM=')
         url += '?' + 'category=%s&groupId=%s&fa6hno2nn2px0=GO&y=1&wjb=' % (stats[optstat], validleagues[optleague])
-        # now, with the url, fetch and return content.
-        html = self._httpget(url)
-        if not html:
+        # now, with the url, fetch and parse. served from _swr when we have it.
+        (leaders, age) = self._swr(url, self._leaders, url)
+        if leaders is None:
             irc.reply("ERROR: Failed to fetch {0}.".format(url))
             self.log.error("ERROR opening {0}".format(url))
             return
-        # sanity check before we can process html.
-        if 'No results available based on the selected criteria.' in html:
+        (results, mlbstats) = leaders
+        if not results:
             irc.reply("ERROR: No results available based on the selected criteria. If using a year, make sure that season has been played.")
             return
-        # process HTML.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        table = soup.find('table', attrs={'class': 'table', 'width': '100%', 'cellspacing': '0'})  # table class="table" width="100%" cellspacing="0"
-        trs = table.findAll('tr')[1:]  # skip the header row.
         # lets do a sanity check.
-        if len(trs) == 0:
+        if len(mlbstats) == 0:
             irc.reply("ERROR: No stats found. Too early in the year?")
             return
-        # we're good. container for the output.
-        mlbstats = []
-        # process the rows
-        for tr in trs:
-            tds = tr.findAll('td')
-            rk = tds[0].getText()
-            plr = tds[1].getText().encode('utf-8')
-            st = tds[2].getText()
-            mlbstats.append("{0}. {1} ({2})".format(rk, plr, st))
         # now we prepare the output.
-        irc.reply("MLB LEADERS IN {0}({1}) :: {2}".format(self._ul(optstat), self._bold(optleague), " | ".join(mlbstats)))
+        irc.reply("MLB LEADERS IN {0}({1}) :: {2}{3}".format(self._ul(optstat), self._bold(optleague), " | ".join(mlbstats), self._staleness(age)))
 
     mlbleaders = wrap(mlbleaders, [getopts({'postseason': '', 'bottom': ''}), ('somethingWithoutSpaces'), ('somethingWithoutSpaces')])
 
@@ -741,36 +2116,60 @@ class MLB(callbacks.Plugin):
             return
         # now that we're done validating the category and have our endurl, build and fetch url.
         url = self._b64decode('aHR0cDovL3d3dy5iYXNlYmFsbC1yZWZlcmVuY2UuY29tL2xlYWRlcnMv') + endurl
-        html = self._httpget(url)
+        html = self._httpget(url, c='leaders')
         if not html:
             irc.reply("ERROR: Failed to fetch {0}.".format(url))
             self.log.error("ERROR opening {0}".format(url))
             return
         # parse html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        #soup = BeautifulSoup(html.replace('&nbsp;',' '))
-        table = soup.find('table', attrs={'data-crop': '50'})
-        rows = table.findAll('tr')[1:11]  # skip first row (header) and get the next 10.
+        tree = self._tree(html)
+        table = self._find(tree, '//table[@data-crop="50"]')
+        rows = self._findall(table, './/tr')[1:11]  # skip first row (header) and get the next 10.
         # output container is a list.
         object_list = []
         # each row is a player.
         for row in rows:
-            rank = row.find('td', attrs={'align': 'right'})
-            player = rank.findNext('td')
-            stat = player.findNext('td')
-            if player.find('strong'):  # ul players are active.
-                player = self._ul(player.find('a').find('strong').getText().strip())
+            rank = self._find(row, './td[@align="right"]')
+            player = self._find(rank, 'following::td[1]')
+            stat = self._find(player, 'following::td[1]')
+            if self._find(player, './/strong') is not None:  # ul players are active.
+                player = self._ul(self._text(self._find(player, './/a//strong')))
             else:  # inactive (+ = HOF).
-                player = player.find('a').getText()
-            object_list.append("{0} {1} ({2})".format(rank.getText(), self._bold(player.encode('utf-8')), stat.getText()))
+                player = self._text(self._find(player, './/a'))
+            object_list.append("{0} {1} ({2})".format(self._text(rank), self._bold(player), self._text(stat)))
         # output time. output header row then our objects.
         output = "{0} {1} (+ indicates HOF; {2} indicates active.)".format(self._red("MLB Career Leaders for: "),\
             self._bold(optcategory), self._ul("UNDERLINE"))
-        irc.reply(output)  # header.
-        irc.reply(" | ".join([item for item in object_list]))  # now our top10.
+        self._packreply(irc, msg, object_list, prefix=output + " :: ")  # header, then our top10.
 
     mlbcareerleaders = wrap(mlbcareerleaders, [('somethingWithoutSpaces'), optional('somethingWithoutSpaces')])
 
+    def _fetchawards(self, optyear):
+        """Fetch and parse the awards page for optyear. Returns a dict of winners,
+        an empty dict if there is no page for that year (yet) or None on error."""
+
+        url = self._b64decode('aHR0cDovL3d3dy5iYXNlYmFsbC1yZWZlcmVuY2UuY29tL2F3YXJkcy8=') + 'awards_%s.shtml' % optyear
+        html = self._httpget(url)
+        if not html:
+            return None
+        # check if we have the page like if we're not done the 2013 season and someone asks for 2013.
+        if "404 - File Not Found" in html:
+            return {}
+        # process html.
+        tree = self._tree(html)
+        awards = {'year': int(optyear)}
+        for (key, title, tableid) in (('almvp', "AL MVP Voting", 'AL_MVP_voting'),
+                                      ('nlmvp', "NL MVP Voting", 'NL_MVP_voting'),
+                                      ('alcy', "AL Cy Young Voting", 'AL_Cy_Young_voting'),
+                                      ('nlcy', "NL Cy Young Voting", 'NL_Cy_Young_voting'),
+                                      ('alroy', "AL Rookie of the Year Voting", 'AL_Rookie_of_the_Year_voting'),
+                                      ('nlroy', "NL Rookie of the Year Voting", 'NL_Rookie_of_the_Year_voting'),
+                                      ('almgr', "AL Mgr of the Year Voting", 'AL_Mgr_of_the_Year_voting'),
+                                      ('nlmgr', "NL Mgr of the Year Voting", 'NL_Mgr_of_the_Year_voting')):
+            winner = self._find(tree, '(//h2[normalize-space(.)="{0}"]/following::table[@id="{1}"][1]//a)[1]'.format(title, tableid))
+            awards[key] = self._text(winner)
+        return awards
+
     def mlbawards(self, irc, msg, args, optyear):
         """<year>
         Display various MLB award winners for current (or previous) year. Use YYYY for year.
@@ -778,84 +2177,64 @@ class MLB(callbacks.Plugin):
         """
 
         # test if we have date or not.
-        if optyear:   # crude way to find the latest awards.
+        latest = not optyear
+        if optyear:
             testdate = self._validate(optyear, '%Y')
             if not testdate:
                 irc.reply("Invalid year. Must be YYYY.")
                 return
-        else:  # we don't have a year, so find the latest.
-            url = self._b64decode('aHR0cDovL3d3dy5iYXNlYmFsbC1yZWZlcmVuY2UuY29tL2F3YXJkcy8=')
-            html = self._httpget(url)
-            if not html:
-                irc.reply("ERROR: Failed to fetch {0}.".format(url))
-                self.log.error("ERROR opening {0}".format(url))
+        else:  # no year. awards are handed out in November so the latest is this year or last.
+            today = datetime.date.today()
+            optyear = today.year if today.month >= 11 else today.year - 1
+        # answer from the store. only go to the network for a season we do not have yet.
+        awards = self._historyget('awards', optyear)
+        if not awards and self._historygap('awards', optyear):
+            row = self._fetchawards(optyear)
+            if row:  # not every award may be out yet. those are kept in memory, not stored.
+                self._historyput('awards', [row])
+                awards = self._historyget('awards', optyear)
+            elif row is None and not latest and ('awards', optyear) not in self._historypartial:
+                irc.reply("ERROR: Failed to fetch awards for: {0}".format(optyear))
                 return
-            soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-            # parse page. find summary. find the first link text. this is our year.
-            link = soup.find('big', text="Baseball Award Voting Summaries").findNext('a')['href'].strip()
-            optyear = ''.join(i for i in link if i.isdigit())
-        # fetch actual awards page .
-        url = self._b64decode('aHR0cDovL3d3dy5iYXNlYmFsbC1yZWZlcmVuY2UuY29tL2F3YXJkcy8=') + 'awards_%s.shtml' % optyear
-        html = self._httpget(url)
-        if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
-            return
-        # check if we have the page like if we're not done the 2013 season and someone asks for 2013.
-        if "404 - File Not Found" in html:
+        if not awards:  # a season still in progress.
+            awards = self._historypartial.get(('awards', optyear))
+        if not awards and latest:  # this season's are not out yet. use the latest we have.
+            awards = self._historyget('awards')
+        if not awards:
             irc.reply("ERROR: I found no award summary for: {0}".format(optyear))
             return
-        # create our variables based on soup.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        alvp = soup.find('h2', text="AL MVP Voting").findNext('table', attrs={'id': 'AL_MVP_voting'}).findNext('a').text
-        nlvp = soup.find('h2', text="NL MVP Voting").findNext('table', attrs={'id': 'NL_MVP_voting'}).findNext('a').text
-        alcy = soup.find('h2', text="AL Cy Young Voting").findNext('table', attrs={'id': 'AL_Cy_Young_voting'}).findNext('a').text
-        nlcy = soup.find('h2', text="NL Cy Young Voting").findNext('table', attrs={'id': 'NL_Cy_Young_voting'}).findNext('a').text
-        alroy = soup.find('h2', text="AL Rookie of the Year Voting").findNext('table', attrs={'id': 'AL_Rookie_of_the_Year_voting'}).findNext('a').text
-        nlroy = soup.find('h2', text="NL Rookie of the Year Voting").findNext('table', attrs={'id': 'NL_Rookie_of_the_Year_voting'}).findNext('a').text
-        almgr = soup.find('h2', text="AL Mgr of the Year Voting").findNext('table', attrs={'id': 'AL_Mgr_of_the_Year_voting'}).findNext('a').text
-        nlmgr = soup.find('h2', text="NL Mgr of the Year Voting").findNext('table', attrs={'id': 'NL_Mgr_of_the_Year_voting'}).findNext('a').text
         # prepare output string.
         output = "{0} MLB Awards :: MVP: AL {1} NL {2}  CY: AL {3} NL {4}  ROY: AL {5} NL {6}  MGR: AL {7} NL {8}".format( \
-            self._red(optyear), self._bold(alvp), self._bold(nlvp), self._bold(alcy), self._bold(nlcy),\
-            self._bold(alroy), self._bold(nlroy), self._bold(almgr), self._bold(nlmgr))
+            self._red(awards['year']), self._bold(awards['almvp']), self._bold(awards['nlmvp']), self._bold(awards['alcy']), self._bold(awards['nlcy']),\
+            self._bold(awards['alroy']), self._bold(awards['nlroy']), self._bold(awards['almgr']), self._bold(awards['nlmgr']))
         # actually output.
         irc.reply(output)
 
     mlbawards = wrap(mlbawards, [optional('int')])
 
-    def mlbschedule(self, irc, msg, args, optteam):
-        """<team>
-        Display the next five upcoming games for team.
-        Ex: NYY
-        """
+    def _scheduleurl(self, team):
+        """Return the schedule page url for team (NYY)."""
+
+        lookupteam = self._translateTeam('eshort', 'team', team)  # (db, column, optteam)
+        return self._b64decode('aHR0cDovL2VzcG4uZ28uY29tL21sYi90ZWFtL3NjaGVkdWxlL18vbmFtZQ==') + '/%s/' % lookupteam
+
+    def _schedule(self, url):
+        """Fetch and parse the schedule page at url into the next five games. None on error."""
 
-        # test for valid teams.
-        optteam = self._validteams(optteam)
-        if not optteam:  # team is not found in aliases or validteams.
-            irc.reply("ERROR: Team not found. Valid teams are: {0}".format(self._allteams()))
-            return
-        # translate team for url.
-        lookupteam = self._translateTeam('eshort', 'team', optteam)  # (db, column, optteam)
-        # build and fetch url.
-        url = self._b64decode('aHR0cDovL2VzcG4uZ28uY29tL21sYi90ZWFtL3NjaGVkdWxlL18vbmFtZQ==') + '/%s/' % lookupteam
         html = self._httpget(url)
         if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
-            return
-        # now soup the actual html. BS cleans up the RSS because the HTML is junk.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        div = soup.find('div', attrs={'id': 'my-teams-table'})
-        table = div.find('table', attrs={'class': 'tablehead'})
-        trs = table.findAll('tr', attrs={'class': re.compile('^evenrow.*|^oddrow.*')})
+            return None
+        # process html.
+        tree = self._tree(html)
+        table = self._find(tree, '//div[@id="my-teams-table"]//table[@class="tablehead"]')
+        trs = self._rowsxp(table)
         #
         container = []
         #
         for (i, tr) in enumerate(trs):
-            tds = tr.findAll('td')
+            tds = self._tdsxp(tr)
             if len(tds) == 7 or len(tds) == 8:
-                sta = tds[3].getText()
+                sta = self._text(tds[3])
                 if sta == "" or sta == "MLB Network":
                     container.append(i)
         #
@@ -863,31 +2242,55 @@ class MLB(callbacks.Plugin):
             schednum = container[0]
         else:
             self.log.info("ERROR: mlbschedule. I only got {0} in container (no [2])".format(container))
-            irc.reply("ERROR: Something went wrong looking up the schedule. Try again later.")
-            return
+            return None
         #
         schedule = []
         #
         for tr in trs[schednum:schednum+5]:
-            tds = tr.findAll('td')
-            dte = tds[0].getText().encode('utf-8')
-            opp = tds[1].getText().encode('utf-8').replace('vs', 'vs ')
-            sta = tds[2].getText().encode('utf-8')
+            tds = self._tdsxp(tr)
+            dte = self._text(tds[0])
+            opp = self._text(tds[1]).replace('vs', 'vs ')
+            sta = self._text(tds[2])
             schedule.append("{0} {1} {2}".format(dte, opp, sta))
-        # prepare output string and output.
-        descstring = " | ".join([item for item in schedule])
-        irc.reply("{0} :: {1}".format(self._bold(optteam), descstring))
+        return schedule
+
+    def mlbschedule(self, irc, msg, args, optteam):
+        """<team[,team...]|division>
+        Display the next five upcoming games for team, several teams or a division.
+        Ex: NYY or NYY,BOS or ALE
+        """
+
+        # test for valid teams.
+        teams = self._teamlist(irc, optteam)
+        if not teams:
+            return
+        # served from _swr when we have it. one fetch per team, all at once.
+        results = self._fanout(lambda team: self._swr(self._scheduleurl(team), self._schedule, self._scheduleurl(team)), teams, (None, None))
+        if len(teams) == 1 and results[0][0] is None:
+            irc.reply("ERROR: Something went wrong looking up the schedule. Try again later.")
+            return
+        # prepare output. one item per game; each team's first carries its name.
+        out = []
+        for (team, (games, age)) in zip(teams, results):
+            if games is None:
+                out.append("{0}: schedule not available.".format(self._bold(team)))
+            elif games:
+                out.extend(["{0} :: {1}".format(self._bold(team), games[0])] + games[1:])
+        ages = [age for (games, age) in results if age is not None]
+        self._packreply(irc, msg, out, suffix=self._staleness(max(ages) if ages else None))
 
     mlbschedule = wrap(mlbschedule, [('somethingWithoutSpaces')])
 
+    _dailyleadersurl = b64decode('aHR0cDovL2VzcG4uZ28uY29tL21sYi9zdGF0cy9kYWlseWxlYWRlcnM=')
+
     def mlbdailyleaders(self, irc, msg, args):
         """
         Display MLB daily leaders.
         """
 
-        # build and fetch url.
-        url = self._b64decode('aHR0cDovL2VzcG4uZ28uY29tL21sYi9zdGF0cy9kYWlseWxlYWRlcnM=')
-        html = self._httpget(url)
+        # fetch url.
+        url = self._dailyleadersurl
+        html = self._httpget(url, c='leaders')
         if not html:
             irc.reply("ERROR: Failed to fetch {0}.".format(url))
             self.log.error("ERROR opening {0}".format(url))
@@ -897,61 +2300,90 @@ class MLB(callbacks.Plugin):
             irc.reply("Sorry, mlbdailyleaders is not available right now")
             return
         # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        mlbdate = soup.find('h1', attrs={'class': 'h2'})
-        div = soup.find('div', attrs={'id': 'my-players-table'})
-        if not div:
+        tree = self._tree(html)
+        mlbdate = self._find(tree, '//h1[@class="h2"]')
+        div = self._find(tree, '//div[@id="my-players-table"]')
+        if div is None:
             irc.reply("ERROR: Broken HTML. Check page formatting.")
             return
-        table = div.find('table', attrs={'class': 'tablehead', 'cellpadding': '3', 'cellspacing': '1'})
-        if not table:
+        table = self._find(div, './/table[@class="tablehead" and @cellpadding="3" and @cellspacing="1"]')
+        if table is None:
             irc.reply("ERROR: Broken HTML. Check page formatting.")
             return
-        rows = table.findAll('tr', attrs={'class': re.compile('evenrow.*|oddrow.*')})
+        rows = self._rowsxp(table)
         # container
         mlbdailyleaders = []
         # iterate over each row.
         for (i, row) in enumerate(rows[0:10]):
-            tds = row.findAll('td')
-            plr = tds[1].getText().encode('utf-8')
+            tds = self._tdsxp(row)
+            plr = self._text(tds[1])
             mlbdailyleaders.append("{0}. {1}".format(i+1, plr))
         # now output.
-        irc.reply("{0} :: {1}".format(self._bold(mlbdate.getText()), " ".join([i for i in mlbdailyleaders])))
+        irc.reply("{0} :: {1}".format(self._bold(self._text(mlbdate)), " ".join([i for i in mlbdailyleaders])))
 
     mlbdailyleaders = wrap(mlbdailyleaders)
 
+    # standings xpaths. compiled once at load. division -> table on the standings page.
+    _divisionxp = dict((div, etree.XPath('//*[@id="{0}"]/table[{1}]'.format(league, n))) for (div, league, n) in (
+        ('ALE', 'league-103', 1), ('ALC', 'league-103', 2), ('ALW', 'league-103', 3),
+        ('NLE', 'league-104', 1), ('NLC', 'league-104', 2), ('NLW', 'league-104', 3)))
+    # wildcard -> table on the wildcard view.
+    _wildcardxp = {'ALWC': etree.XPath('//*[@id="league-103"]/table[2]'), 'NLWC': etree.XPath('//*[@id="league-104"]/table[2]')}
+    _standingsteamxp = etree.XPath('.//span[@class="title-short"]/text()')
+    _standingsgbxp = etree.XPath('.//td[@class="standings-col-gb"]/text()')
+
+    def _standingsrows(self, tree, xps):
+        """Return {key: [(team, gb)]} for each table xpath in xps found in tree."""
+
+        out = {}
+        for (key, xp) in xps.items():
+            tables = xp(tree)
+            if tables:
+                out[key] = zip(self._standingsteamxp(tables[0]), self._standingsgbxp(tables[0]))
+        return out
+
+    def _buildstandings(self):
+        """Fetch the standings and wildcard pages and build the snapshot. None on error."""
+
+        standings = self._httpget('http://m.mlb.com/standings/', c='live')
+        wildcard = self._httpget('http://m.mlb.com/standings/?view=wildcard', c='live')
+        if not standings or not wildcard:
+            return None
+        snap = self._standingsrows(self._tree(standings), self._divisionxp)
+        snap.update(self._standingsrows(self._tree(wildcard), self._wildcardxp))
+        self._standingssnap = (time.time(), snap)
+        return snap
+
+    def _standings(self):
+        """Return the standings snapshot {ALE..NLW, ALWC, NLWC: [(team, gb)]}, rebuilding it when
+        older than standingsRefresh. Concurrent rebuilds are coalesced. None if we have nothing."""
+
+        snap = self._standingssnap
+        if snap and snap[0] > time.time() - self.registryValue('standingsRefresh'):
+            return snap[1]
+        standings = self._cmdflight.do(('standings',), self._buildstandings)
+        if standings is None and snap:  # keep serving the last one we had.
+            return snap[1]
+        return standings
+
     def mlbwildcard(self, irc, msg, args):
         """
         Display AL/NL Wildcard standings.
         """
 
-        url = 'http://m.mlb.com/standings/?view=wildcard'
-        # now fetch url.
-        page = requests.get(url)
-        if not page:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
+        wildcard = self._standings()
+        if not wildcard:
+            irc.reply("ERROR: Failed to fetch wildcard standings.")
             return
-        # process html.
-        tree = html.fromstring(page.content)
-        alwct = tree.xpath('//*[@id="league-103"]/table[2]//span[@class="title-short"]/text()')
-        alwcg = tree.xpath('//*[@id="league-103"]/table[2]//td[@class="standings-col-gb"]/text()')
-        nlwct = tree.xpath('//*[@id="league-104"]/table[2]//span[@class="title-short"]/text()')
-        nlwcg = tree.xpath('//*[@id="league-104"]/table[2]//td[@class="standings-col-gb"]/text()')
         out = collections.defaultdict(list)
-        for idx, val in enumerate(alwct):
-            if idx > 0:
-                out["ALWC"].append("{0} -{1}".format(self._bold(val), alwcg[idx]))
-            else:
-                out["ALWC"].append("{0} {1}".format(self._bold(val), alwcg[idx]))
-        for idx, val in enumerate(nlwct):
-            if idx > 0:
-                out["NLWC"].append("{0} -{1}".format(self._bold(val), nlwcg[idx]))
-            else:
-                out["NLWC"].append("{0} {1}".format(self._bold(val), nlwcg[idx]))
+        for wc in ('ALWC', 'NLWC'):
+            for idx, (team, gb) in enumerate(wildcard.get(wc, [])):
+                if idx > 0:
+                    out[wc].append("{0} -{1}".format(self._bold(team), gb))
+                else:
+                    out[wc].append("{0} {1}".format(self._bold(team), gb))
         #
-        for (z, x) in list(out.items()):
-            irc.reply("{0} :: {1}".format(self._bold(z), ", ".join([a for a in x])))
+        self._packreply(irc, msg, ["{0} :: {1}".format(self._bold(z), ", ".join([a for a in x])) for (z, x) in out.items()], separator=" || ")
 
     mlbwildcard = wrap(mlbwildcard)
 
@@ -961,37 +2393,28 @@ class MLB(callbacks.Plugin):
         Display division standings.
         """
 
-        optdiv = optdiv.upper()  # upper to match keys. values are in the table to match with the html.
-        leaguetable = {'ALE': '//*[@id="league-103"]/table[1]',
-                       'ALC': '//*[@id="league-103"]/table[2]',
-                       'ALW': '//*[@id="league-103"]/table[3]',
-                       'NLE': '//*[@id="league-104"]/table[1]',
-                       'NLC': '//*[@id="league-104"]/table[2]',
-                       'NLW': '//*[@id="league-104"]/table[3]'}
-        if optdiv not in leaguetable:  # make sure keys are present.
-            irc.reply("ERROR: League must be one of: {0}".format(" | ".join(sorted(leaguetable.keys()))))
-            return
-
-        # build and fetch url. diff urls depending on option.
-        url = 'http://m.mlb.com/standings/'
-        # now fetch url.
-        page = requests.get(url)
-        if not page:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
+        optdiv = optdiv.upper()  # upper to match keys.
+        if optdiv not in self._divisionxp:  # make sure keys are present.
+            irc.reply("ERROR: League must be one of: {0}".format(" | ".join(sorted(self._divisionxp.keys()))))
+            return
+        # every division comes from the same snapshot.
+        standings = self._standings()
+        if standings is None:
+            irc.reply("ERROR: Failed to fetch standings.")
             return
-        # process html.
-        tree = html.fromstring(page.content)
-        teams = tree.xpath('{0}//span[@class="title-short"]/text()'.format(leaguetable[optdiv]))
-        gb = tree.xpath('{0}//td[@class="standings-col-gb"]/text()'.format(leaguetable[optdiv]))
         out = []
-        for idx, val in enumerate(teams):
-            out.append("{0} -{1}".format(val, gb[idx]))
+        for (team, gb) in standings.get(optdiv, []):
+            out.append("{0} -{1}".format(team, gb))
         # output to irc.
         irc.reply("{0} :: {1}".format(optdiv, ", ".join([i for i in out])))
 
     mlbstandings = wrap(mlbstandings, [('somethingWithoutSpaces')])
 
+    def _lineupurl(self, team):
+        """Return the lineup page url for team (NYY)."""
+
+        return self._b64decode('aHR0cDovL2Jhc2ViYWxscHJlc3MuY29tL2xpbmV1cF90ZWFtLnBocD90ZWFtPQ==') + team
+
     def mlblineup(self, irc, msg, args, optteam):
         """<team>
         Gets lineup for MLB team.
@@ -1003,9 +2426,9 @@ class MLB(callbacks.Plugin):
         if not optteam:  # team is not found in aliases or validteams.
             irc.reply("ERROR: Team not found. Valid teams are: {0}".format(self._allteams()))
             return
-        # create url and fetch lineup page.
-        url = self._b64decode('aHR0cDovL2Jhc2ViYWxscHJlc3MuY29tL2xpbmV1cF90ZWFtLnBocD90ZWFtPQ==') + optteam
-        html = self._httpget(url)
+        # create url and fetch lineup page. prefetched during the afternoon.
+        url = self._lineupurl(optteam)
+        html = self._httpget(url, c='lineup')
         if not html:
             irc.reply("ERROR: Failed to fetch {0}.".format(url))
             self.log.error("ERROR opening {0}".format(url))
@@ -1015,35 +2438,65 @@ class MLB(callbacks.Plugin):
             irc.reply("ERROR: No game today for {0}".format(optteam))
             return
         # process html. this is kinda icky.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        div = soup.find('div', attrs={'class': 'team-lineup highlight'})
+        tree = self._tree(html)
+        div = self._find(tree, '//div[@class="team-lineup highlight"]')
         # test if we have a game?
-        if "No game" in div.getText():
+        if "No game" in self._text(div):
             irc.reply("Sorry, I don't have a game for today.")
             return
-        divs = div.findAll('div')
+        divs = self._findall(div, './/div')
         # 20140330 - had to fix this again.
-        gmdate = divs[1].getText()  # date of game.
+        gmdate = self._text(divs[1])  # date of game.
         seconddiv = divs[3]   # opp pitcher.
-        otherpitcher = seconddiv.getText()  # opp pitcher and team.
-        lineup = div.find('div', attrs={'class': 'game-lineup'})
+        otherpitcher = self._text(seconddiv)  # opp pitcher and team.
+        lineup = self._find(div, './/div[@class="game-lineup"]')
         # sanity check.
-        if "No lineup yet" in lineup.getText():
+        if "No lineup yet" in self._text(lineup):
             irc.reply("Sorry, I don't have a lineup yet for: {0}".format(gmdate))
             return
         else:  # div is a collection of divs, each div = person in lineup.
-            lineup = lineup.findAll('div')
-            lineup = " | ".join([i.getText(separator=' ').encode('utf-8') for i in lineup])
+            lineup = self._findall(lineup, './/div')
+            lineup = " | ".join([self._text(i, ' ') for i in lineup])
         # output.
         irc.reply("{0} LINEUP :: ({1}, {2}) :: {3}".format(self._bold(optteam), gmdate, otherpitcher, lineup))
 
     mlblineup = wrap(mlblineup, [('somethingWithoutSpaces')])
 
+    def _injuriesurl(self, team):
+        """Return the injuries page url for team (NYY)."""
+
+        lookupteam = self._translateTeam('roto', 'team', team)
+        return self._b64decode('aHR0cDovL3JvdG93b3JsZC5jb20vdGVhbXMvaW5qdXJpZXMvbWxi') + '/%s/' % lookupteam
+
+    def _injuries(self, url):
+        """Fetch and parse the injuries page at url into a list of dicts (one per injury). None on error."""
+
+        html = self._httpget(url)
+        if not html:
+            return None
+        # process html. no player divs means no injuries.
+        rows = self._extract(html, {'players': ('(//div[@class="player"])[1]', '.', None),
+                                    'injuries': ('(//table[@align="center" and @width="600px;"])[1]//tr', './/td', None)})
+        if not rows['players']:
+            return []
+        # output list.
+        object_list = []
+        # first is header, rest is injury.
+        for (group, tds) in rows['injuries'][1:]:
+            d = {}
+            d['name'] = tds[0]
+            d['status'] = tds[3]
+            d['date'] = tds[4].replace("\xc2\xa0", " ")
+            d['injury'] = tds[5]
+            d['returns'] = tds[6]
+            object_list.append(d)  # append the dict in the list.
+        return object_list
+
     def mlbinjury(self, irc, msg, args, optlist, optteam):
-        """[--details] <team>
-        Show all injuries for team.
+        """[--details] <team[,team...]|division>
+        Show all injuries for team, several teams or a division.
         Use --details to display full table with team injuries.
-        Ex: --details BOS or NYY
+        Ex: --details BOS or NYY or NYY,BOS or ALE
         """
 
         # handle optlist (getopts)
@@ -1052,51 +2505,40 @@ class MLB(callbacks.Plugin):
             if option == 'details':
                 details = True
         # test for valid teams.
-        optteam = self._validteams(optteam)
-        if not optteam:  # team is not found in aliases or validteams.
-            irc.reply("ERROR: Team not found. Valid teams are: {0}".format(self._allteams()))
-            return
-        # build and fetch url.
-        lookupteam = self._translateTeam('roto', 'team', optteam)
-        url = self._b64decode('aHR0cDovL3JvdG93b3JsZC5jb20vdGVhbXMvaW5qdXJpZXMvbWxi') + '/%s/' % lookupteam
-        html = self._httpget(url)
-        if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
-            return
-        # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        if not soup.find('div', attrs={'class': 'player'}):
-            irc.reply("No injuries found for: {0}".format(optteam))
-            return
-        # if we do, find the table.
-        table = soup.find('table', attrs={'align': 'center', 'width': '600px;'})
-        rows = table.findAll('tr')[1:]
-        # output list.
-        object_list = []
-        # first is header, rest is injury.
-        for row in rows:
-            tds = row.findAll('td')
-            d = {}
-            d['name'] = tds[0].find('a').getText().encode('utf-8')
-            d['status'] = tds[3].getText().encode('utf-8')
-            d['date'] = tds[4].getText().strip().replace("&nbsp;", " ").encode('utf-8')
-            d['injury'] = tds[5].getText().encode('utf-8')
-            d['returns'] = tds[6].getText().encode('utf-8')
-            object_list.append(d)  # append the dict in the list.
-        # are there any injuries?
-        if len(object_list) < 1:
-            irc.reply("{0} :: No injuries.".format(self._red(optteam)))
-            return
-        # output time. conditional if we're showing details or not.
-        if details:  # show each injury with details.
-            irc.reply("{0} :: {1} Injuries".format(self._red(optteam), len(object_list)))
-            irc.reply("{0:27} {1:9} {2:<10} {3:<15} {4:<15}".format("NAME", "STATUS", "DATE", "INJURY", "RETURNS"))
-            for inj in object_list:  # one per line since we are detailed.
-                irc.reply("{0:<27} {1:<9} {2:<10} {3:<15} {4:<15}".format(inj['name'], inj['status'], inj['date'], inj['injury'], inj['returns']))
-        else:  # no detail.
-            irc.reply("{0} :: {1} Injuries".format(self._red(optteam), len(object_list)))
-            irc.reply(" | ".join([item['name'] + " (" + item['returns'] + ")" for item in object_list]))
+        teams = self._teamlist(irc, optteam)
+        if not teams:
+            return
+        # served from _swr when we have it. one fetch per team, all at once.
+        results = self._fanout(lambda team: self._swr(self._injuriesurl(team), self._injuries, self._injuriesurl(team)), teams, (None, None))
+        ages = [age for (object_list, age) in results if age is not None]
+        staleness = self._staleness(max(ages) if ages else None)
+        if len(teams) == 1:
+            (optteam, (object_list, age)) = (teams[0], results[0])
+            if object_list is None:
+                irc.reply("ERROR: Failed to fetch {0}.".format(self._injuriesurl(optteam)))
+                self.log.error("ERROR opening {0}".format(self._injuriesurl(optteam)))
+                return
+            # are there any injuries?
+            if len(object_list) < 1:
+                irc.reply("{0} :: No injuries.{1}".format(self._red(optteam), staleness))
+                return
+            prefix = "{0} :: {1} Injuries :: ".format(self._red(optteam), len(object_list))
+        else:  # every team's list in one reply.
+            prefix = "{0} :: {1} Injuries :: ".format(self._red(", ".join(teams)), sum([len(r[0]) for r in results if r[0]]))
+        # output time. conditional if we're showing details or not. with several teams, each team's first carries its name.
+        out = []
+        for (team, (object_list, age)) in zip(teams, results):
+            if object_list is None:
+                out.append("{0}: failed to fetch.".format(self._bold(team)))
+                continue
+            if details:  # show each injury with details.
+                items = ["{0} {1} since {2}: {3}, returns {4}".format(self._bold(inj['name']), inj['status'], inj['date'], inj['injury'], inj['returns']) for inj in object_list]
+            else:  # no detail.
+                items = [item['name'] + " (" + item['returns'] + ")" for item in object_list]
+            if len(teams) > 1:
+                items = ["{0}: {1}".format(self._bold(team), items[0])] + items[1:] if items else ["{0}: none".format(self._bold(team))]
+            out.extend(items)
+        self._packreply(irc, msg, out, prefix=prefix, suffix=staleness)
 
     mlbinjury = wrap(mlbinjury, [getopts({'details': ''}), ('somethingWithoutSpaces')])
 
@@ -1121,23 +2563,23 @@ class MLB(callbacks.Plugin):
         # build and fetch url. it's conditional based on k/v above.
         url = self._b64decode('aHR0cDovL20uZXNwbi5nby5jb20vbWxiL2FnZ3JlZ2F0ZXM=')
         url += '?category=%s&groupId=%s&y=1&wjb=' % (category[optcategory], league[optleague])
-        html = self._httpget(url)
+        html = self._httpget(url, c='leaders')
         if not html:
             irc.reply("ERROR: Failed to fetch {0}.".format(url))
             self.log.error("ERROR opening {0}".format(url))
             return
         # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        table = soup.find('table', attrs={'class': 'table'})
-        rows = table.findAll('tr')
+        tree = self._tree(html)
+        table = self._find(tree, '//table[@class="table"]')
+        rows = self._findall(table, './/tr')
         # list for output.
         append_list = []
         # one per row. first row = header. top 5 only.
         for row in rows[1:11]:
-            tds = row.findAll('td')
-            rank = tds[0].getText()
-            team = tds[1].getText()
-            num = tds[2].getText()
+            tds = self._tdsxp(row)
+            rank = self._text(tds[0])
+            team = self._text(tds[1])
+            num = self._text(tds[2])
             append_list.append("{0}. {1} {2}".format(rank, team, num))
         # output
         thelist = " | ".join([item for item in append_list])
@@ -1145,6 +2587,91 @@ class MLB(callbacks.Plugin):
 
     mlbleagueleaders = wrap(mlbleagueleaders, [('somethingWithoutSpaces'), ('somethingWithoutSpaces')])
 
+    # the probables page uses its own abbreviations. translated once at ingest.
+    _probabbrs = {'WAS': 'WSH', 'CHW': 'CWS', 'KAN': 'KC', 'TAM': 'TB', 'SFO': 'SF', 'SDG': 'SD'}
+    _probabbrsre = re.compile(r'\b(WAS|CHW|KAN|TAM|SFO|SDG)\b')
+
+    def _probteam(self, string):
+        """Translate probables page abbreviations (WAS, CHW, ...) in string into ours."""
+
+        return self._probabbrsre.sub(lambda m: self._probabbrs[m.group(1)], string)
+
+    def _probables(self, eachdate):
+        """Fetch and parse the probables page for eachdate (YYYYmmDD).
+        Returns a list of dicts (one per game), an empty list if no games
+        are scheduled or None if the page could not be fetched/parsed."""
+
+        # build and fetch url.
+        url = self._b64decode('aHR0cDovL20uZXNwbi5nby5jb20vbWxiL3Byb2JhYmxlcz93amI9') + '&date=%s' % eachdate
+        html = self._httpget(url)
+        if not html:
+            return None
+        # if no games on, skip before any parsing. (like around the ASB)
+        if "No Games Scheduled" in html:
+            return []
+        try:
+            # process html.
+            tree = self._tree(html)
+            rows = self._findall(tree, '//div[contains(@class, "ind alt tL spaced") or contains(@class, "ind tL spaced")]')
+            probables = []
+            # each row is a game that day.
+            for row in rows:  # we grab the matchup (text) to match. the rest goes into a dict.
+                contents = (row.text or '').encode('utf-8') + ''.join([etree.tostring(c, encoding='utf-8', method='html') for c in row])
+                textmatch = re.search(r'<a class="bold inline".*?<br\s*/?>(.*?)<a class="inline".*?=">(.*?)</a>(.*?)<br\s*/?>(.*?)<a class="inline".*?=">(.*?)</a>(.*?)$', contents, re.I|re.S|re.M)
+                if textmatch:  # only inject if we match
+                    d = {}
+                    d['date'] = eachdate  # text from above. use xpath for matchup and regex for the rest.
+                    d['matchup'] = self._probteam(self._text(self._find(row, './/a[@class="bold inline"]')))
+                    d['vteam'] = self._probteam(textmatch.group(1).strip().replace(':', ''))
+                    d['vpitcher'] = textmatch.group(2).strip()
+                    d['vpstats'] = textmatch.group(3).strip()
+                    d['hteam'] = self._probteam(textmatch.group(4).strip().replace(':', ''))
+                    d['hpitcher'] = textmatch.group(5).strip()
+                    d['hpstats'] = textmatch.group(6).strip()
+                    probables.append(d)  # order preserved via list. we add the dict.
+            return probables
+        except Exception as e:
+            self.log.error("ERROR :: _probables :: {0} :: {1}".format(eachdate, e))
+            return None
+
+    def _probablesindex(self, eachdate, force=False):
+        """Return the all-teams probables index for eachdate: a dict of team -> [games].
+        Built once per date from _probables and rebuilt when older than probablesRefresh
+        (or force). If a rebuild fails we keep serving the last good index. None on error."""
+
+        with self._problock:
+            entry = self._probindex.get(eachdate)
+        if entry and not force and entry[0] > time.time() - self.registryValue('probablesRefresh'):
+            return entry[1]
+        probables = self._probables(eachdate)
+        if probables is None:
+            return entry[1] if entry else None
+        # each game is indexed under both teams in it.
+        index = collections.defaultdict(list)
+        for d in probables:
+            teams = set(re.findall('[A-Z]+', d['matchup'])) | set([d['vteam'], d['hteam']])
+            for team in teams:
+                index[team].append(d)
+        with self._problock:
+            self._probindex[eachdate] = (time.time(), dict(index))
+        return dict(index)
+
+    def _probdates(self):
+        """Return today + next 4 dates as YYYYmmDD."""
+
+        return [(datetime.date.today() + datetime.timedelta(days=i)).strftime("%Y%m%d") for i in range(5)]
+
+    def _refreshprobables(self):
+        """Scheduled. Drop past dates from the probables index and rebuild the rest in the background."""
+
+        dates = self._probdates()
+        with self._problock:
+            for eachdate in self._probindex.keys():
+                if eachdate not in dates:
+                    del self._probindex[eachdate]
+        # never block the scheduler (driver) thread on the network.
+        self._fetchpool.map_async(lambda eachdate: self._probablesindex(eachdate, force=True), dates)
+
     def mlbprob(self, irc, msg, args, optteam):
         """<TEAM>
         Display the MLB probables for a team over the next 5 starts.
@@ -1157,50 +2684,31 @@ class MLB(callbacks.Plugin):
             irc.reply("ERROR: Team not found. Valid teams are: {0}".format(self._allteams()))
             return
         # put today + next 4 dates in a list, YYYYmmDD via strftime
-        dates = [(datetime.date.today() + datetime.timedelta(days=i)).strftime("%Y%m%d") for i in range(5)]
-        # output container for each day/start.
-        probables = []
-        # now iterate through each day.
-        for eachdate in dates:
-            # build and fetch url.
-            url = self._b64decode('aHR0cDovL20uZXNwbi5nby5jb20vbWxiL3Byb2JhYmxlcz93amI9') + '&date=%s' % eachdate
-            html = self._httpget(url)
-            if not html:
-                irc.reply("ERROR: Failed to fetch {0}.".format(url))
-                self.log.error("ERROR opening {0}".format(url))
-                return
-            # process html. must do a sanity check + mangle team names before anything.
-            # if no games on, NEXT. (like around the ASB)
-            if "No Games Scheduled" in html:
-                next
-            # have to mangle these because of horrid abbreviations.
-            html = html.replace('WAS', 'WSH').replace('CHW', 'CWS').replace('KAN', 'KC').replace('TAM', 'TB').replace('SFO', 'SF').replace('SDG', 'SD')
-            # process html.
-            soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-            rows = soup.findAll('div', attrs={'class': re.compile('ind alt tL spaced|ind tL spaced')})
-            # each row is a game that day.
-            for row in rows:  # we grab the matchup (text) to match. the rest goes into a dict.
-                textmatch = re.search(r'<a class="bold inline".*?<br />(.*?)<a class="inline".*?=">(.*?)</a>(.*?)<br />(.*?)<a class="inline".*?=">(.*?)</a>(.*?)$', row.renderContents(), re.I|re.S|re.M)
-                if textmatch:  # only inject if we match
-                    d = {}
-                    d['date'] = eachdate  # text from above. use BS for matchup and regex for the rest.
-                    d['matchup'] = row.find('a', attrs={'class': 'bold inline'}).getText().strip()
-                    d['vteam'] = textmatch.group(1).strip().replace(':', '')
-                    d['vpitcher'] = textmatch.group(2).strip()
-                    d['vpstats'] = textmatch.group(3).strip()
-                    d['hteam'] = textmatch.group(4).strip().replace(':', '')
-                    d['hpitcher'] = textmatch.group(5).strip()
-                    d['hpstats'] = textmatch.group(6).strip()
-                    probables.append(d)  # order preserved via list. we add the dict.
+        dates = self._probdates()
+        # each date is a lookup in the index. dates not yet indexed are fetched in parallel, in date order.
+        results = self._fanout(self._probablesindex, dates)
+        # output container for each day/start. dates that failed are kept for the error.
+        probables, failed = [], []
+        for (eachdate, result) in zip(dates, results):
+            if result is None:
+                failed.append(eachdate)
+            else:
+                probables.extend(result.get(optteam, []))
+        if failed:
+            self.log.error("ERROR :: mlbprob :: could not fetch probables for {0}".format(", ".join(failed)))
         # check to see if we have anything?
         if len(probables) == 0:
             irc.reply("Sorry, I have no probables for {0}".format(optteam))
             return
         # now lets output.
-        for eachentry in probables:  # iterate through list and only output when team is matched.
-            if optteam in eachentry['matchup']:  # if optteam is contained in matchup, we output.
-                irc.reply("{0:10} {1:25} {2:4} {3:15} {4:15} {5:4} {6:15} {7:15}".format(eachentry['date'], eachentry['matchup'],\
-                    eachentry['vteam'], eachentry['vpitcher'],eachentry['vpstats'], eachentry['hteam'], eachentry['hpitcher'], eachentry['hpstats']))
+        out = []
+        for eachentry in probables:
+            out.append("{0} {1} :: {2} {3} {4} vs. {5} {6} {7}".format(self._bold(eachentry['date']), eachentry['matchup'],\
+                eachentry['vteam'], eachentry['vpitcher'], eachentry['vpstats'], eachentry['hteam'], eachentry['hpitcher'], eachentry['hpstats']))
+        self._packreply(irc, msg, out, prefix="{0} :: ".format(self._red(optteam)))
+        # partial results. let them know what is missing.
+        if failed:
+            irc.reply("NOTE: Could not fetch probables for: {0}".format(", ".join(failed)))
 
     mlbprob = wrap(mlbprob, [('somethingWithoutSpaces')])
 
@@ -1218,73 +2726,132 @@ class MLB(callbacks.Plugin):
         # possibly strip jr/sr/III suffixes in here?
         return name
 
-    def _similarPlayers(self, optname):
-        """Return a dict containing the five most similar players based on optname."""
+    def _loadplayers(self):
+        """Return the player directory from the data db as a list of dicts."""
+
+        with sqlite3.connect(self._datadb) as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name, normname, team, pos FROM players")
+            return [dict(row) for row in cursor.fetchall()]
+
+    def _fetchplayers(self):
+        """Fetch and parse the players source page. Returns a list of dicts or None."""
 
         url = self._b64decode('aHR0cHM6Ly9lcmlrYmVyZy5jb20vbWxiL3BsYXllcnM=')
         html = self._httpget(url)
         if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.info("ERROR opening {0}".format(url))
             return None
-        # now that we have the list, lets parse the json.
         try:
-            soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-            table = soup.find('table')
-            # do a sanity check.
-            trs = table.find('tbody').findAll('tr')
-            activeplayers = []
+            # thousands of rows. this is the biggest page we parse.
+            rows = self._extract(html, {'heads': ('(//table)[1]/thead', './/th', None),
+                                        'players': ('(//table)[1]/tbody/tr', './/td', None)})
+            # team/position columns, if the source has them, are found by their header.
+            heads = [h.lower() for h in rows['heads'][0][1]] if rows['heads'] else []
+            teamcol = [i for (i, h) in enumerate(heads) if h.startswith('team')]
+            poscol = [i for (i, h) in enumerate(heads) if h.startswith('pos')]
+            players = []
             # iterate over each row.
-            for tr in trs:
-                tds = tr.findAll('td')
-                i = tds[0].getText().replace('.', '')  # id.
-                n = tds[1].find('a').getText() #.encode('utf-8')  # name.
-                #n = ftfy.fix_text(n)
-                activeplayers.append({'id': i, 'full_name': n})
+            for (group, tds) in rows['players']:
+                n = tds[1].decode('utf-8')
+                players.append({'id': tds[0].replace('.', ''),  # id.
+                                'name': n,
+                                'normname': self._sanitizeName(n),
+                                'team': tds[teamcol[0]] if teamcol and len(tds) > teamcol[0] else None,
+                                'pos': tds[poscol[0]] if poscol and len(tds) > poscol[0] else None})
         except Exception, e:
-            self.log.info("ERROR: _similarPlayers :: Could not parse source for players :: {0}".format(e))
+            self.log.info("ERROR: _fetchplayers :: Could not parse source for players :: {0}".format(e))
             return None
+        return players
+
+    def _updateplayers(self):
+        """Fetch the players source and store new/changed players. Players that drop off
+        the source are kept so the directory also covers former players."""
+
+        players = self._fetchplayers()
+        if not players:
+            self.log.info("ERROR: _updateplayers :: could not find any players in players source")
+            return
+        known = dict((p['id'], p) for p in self._players)
+        changed = [p for p in players if known.get(p['id']) != p]
+        if changed:
+            with sqlite3.connect(self._datadb) as conn:
+                conn.executemany("INSERT OR REPLACE INTO players (id, name, normname, team, pos) VALUES (?, ?, ?, ?, ?)",
+                                 [(p['id'], p['name'], p['normname'], p['team'], p['pos']) for p in changed])
+            known.update((p['id'], p) for p in changed)
+            self._players = known.values()  # swap, never mutate what readers hold.
+            self._nameindex = NameIndex(self._players)
+        self.log.info("_updateplayers :: {0} players. {1} new or changed.".format(len(self._players), len(changed)))
+
+    def _refreshplayers(self):
+        """Scheduled. Update the player directory in the background."""
+
+        self._fetchpool.apply_async(self._updateplayers)
+
+    def _similarPlayers(self, optname):
+        """Return a list of dicts (fullname, id) with the most similar players to optname."""
+
+        # the directory is indexed in memory. no network here.
+        index = self._nameindex
         # test length as sanity check.
-        if len(activeplayers) == 0:
-            self.log.info("ERROR: _similarPlayers :: length 0. Could not find any players in players source")
+        if len(index) == 0:
+            self.log.info("ERROR: _similarPlayers :: player directory is empty. Is it still loading?")
             return None
-        # ok, finally, lets go.
-        optname = self._sanitizeName(optname)  # sanitizename.
-        optname = unicode(optname)  # must be unicode.
-        jaro, damerau = [], []  # empty lists to put our results in.
-        # now we create the container to iterate over.
-        names = [{'fullname': self._sanitizeName(v['full_name']), 'id':v['id']} for v in activeplayers]  # full_name # last_name # first_name
-        # iterate over the entries.
-        for row in names:  # list of dicts.
-            try:  # some error stuff.
-                jaroscore = jellyfish.jaro_distance(optname, row['fullname'])  # jaro.
-                damerauscore = jellyfish.damerau_levenshtein_distance(optname, row['fullname'])  # dld
-                jaro.append({'jaro': jaroscore, 'fullname': row['fullname'], 'id': row['id']})  # add dict to list.
-                damerau.append({'damerau': damerauscore, 'fullname': row['fullname'], 'id': row['id']})  # ibid.
-            except Exception as e:
-                self.log.info("_similarPlayers :: ERROR :: {0} :: {1}".format(row, e))
-                continue
-        # now, we do two "sorts" to find the "top5" matches. reverse is opposite on each.
-        jarolist = sorted(jaro, key=itemgetter('jaro'), reverse=True)[0:5]  # bot five.
-        dameraulist = sorted(damerau, key=itemgetter('damerau'), reverse=False)[0:5]  # top five.
-        # we now have two lists, top5 sorted, and need to do some further things.
-        # now, lets iterate through both lists. match if both are in it. (better matches)
-        matching = [k for k in jarolist if k['id'] in [f['id'] for f in dameraulist]]
-        # now, test if we have anything. better matches will have more.
-        if len(matching) == 0:  # we have NO matches. grab the top two from jaro/damerau (for error str)
-            matching = [jarolist[0], dameraulist[0], jarolist[1], dameraulist[1]]
-            self.log.info("_similarPlayers :: NO MATCHES for {0} :: {1}".format(optname, matching))
-        # return matching now.
+        matching = index.search(self._sanitizeName(optname))
+        if not matching:
+            self.log.info("_similarPlayers :: NO MATCHES for {0}".format(optname))
         return matching
 
+    def _pfcacheget(self, db, pname):
+        """Return (url,) for a cached _pf lookup still within its TTL or None. url is
+        None for a cached miss (negative entry), which has its own shorter TTL."""
+
+        with sqlite3.connect(self._datadb) as conn:
+            conn.text_factory = str
+            cursor = conn.cursor()
+            cursor.execute("SELECT url, added FROM playerurls WHERE db=? AND name=?", (db, pname))
+            row = cursor.fetchone()
+        if not row:
+            return None
+        ttl = self.registryValue('playerURLs.ttl') if row[0] else self.registryValue('playerURLs.negativeTTL')
+        if row[1] < time.time() - ttl:
+            return None
+        return (row[0],)
+
+    def _pfcacheput(self, db, pname, url):
+        """Remember the _pf result (url or None for not found) for pname."""
+
+        with sqlite3.connect(self._datadb) as conn:
+            conn.execute("INSERT OR REPLACE INTO playerurls (db, name, url, added) VALUES (?, ?, ?, ?)",
+                         (db, pname, url, int(time.time())))
+
+    def _pfcacheclear(self, db=None, pname=None):
+        """Forget cached _pf lookups. Everything, or only for pname and/or db. Returns number removed."""
+
+        query, params = "DELETE FROM playerurls WHERE 1=1", []
+        if db:
+            query += " AND db=?"
+            params.append(db)
+        if pname:
+            query += " AND name=?"
+            params.append(' '.join(self._sanitizeName(pname).split()))
+        with sqlite3.connect(self._datadb) as conn:
+            return conn.execute(query, params).rowcount
+
     def _pf(self, db, pname):
-        """<e|r|s> <player>
+        """<e|r|s|br> <player>
 
         Find a player's page via google ajax. Specify DB based on site.
+        Results (and misses) are cached in the data db. See playerURLs.
         """
 
         # sanitize.
         pname = self._sanitizeName(pname)
+        key = ' '.join(pname.split())
+        # cached?
+        cached = self._pfcacheget(db, key)
+        if cached:
+            return cached[0]
 
         # db.
         if db == "e":  # espn.
@@ -1301,17 +2868,21 @@ class MLB(callbacks.Plugin):
             burl = quote_plus("'" + burl + "'")
             url = self._b64decode("aHR0cHM6Ly93d3cuZ29vZ2xlLmNvbS8=") + "search?q=%s&ie=utf-8&oe=utf-8&aq=t&rls=org.mozilla:en-US:official&client=firefox-a&channel=sb" % (burl)
             headers = {'User-agent': 'Mozilla/5.0 (Windows NT 6.1; WOW64; rv:33.0) Gecko/20100101 Firefox/33.0'}
-            r = requests.get(url, headers=headers)
-            html = BeautifulSoup(r.content)
-            div = html.find('div', attrs={'id': 'search'})
-            lnks = div.findAll('a')
-            if len(lnks) == 0:
+            html = self._httpget(url, h=headers)
+            if not html:  # fetch error. don't cache.
+                return None
+            search = self._find(self._tree(html), '//div[@id="search"]')
+            if search is None:  # consent, captcha or "unusual traffic" page. not a miss, don't cache.
+                self.log.info("ERROR :: _pf :: no search results on {0}".format(url))
                 return None
-            lnkone = lnks[0]
-            return lnkone['href']
+            lnks = self._findall(search, './/a')
+            lnkone = lnks[0].get('href') if lnks else None
         except Exception as e:
             self.log.info("ERROR :: _pf :: {0}".format(e))
             return None
+        # cache hits and misses so typos don't search again each time.
+        self._pfcacheput(db, key, lnkone)
+        return lnkone
 
     def _so(self, d):
         """<dict>
@@ -1345,41 +2916,41 @@ class MLB(callbacks.Plugin):
             self.log.error("ERROR opening {0}".format(url))
             return None
         # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        div = soup.find('div', attrs={'class': 'table_container'})
-        if not div:
+        tree = self._tree(html)
+        div = self._find(tree, '//div[@class="table_container"]')
+        if div is None:
             irc.reply("ERROR: No player information for '{0}' at '{1}'".format(optplayer, url))
             return
-        table = div.find('table')
-        if not table:
+        table = self._find(div, './/table')
+        if table is None:
             irc.reply("ERROR: No player information for '{0}' at '{1}'".format(optplayer, url))
             return
         # playername:
-        pn = soup.find('span', attrs={'id': 'player_name'}).getText().encode('utf-8')
-        # columns. bad parsing on BS end. We don't know what comes back. lets do a neat trick here.
-        chz = table.find('thead').findAll('th')
+        pn = self._text(self._find(tree, '//span[@id="player_name"]'))
+        # columns. We don't know what comes back. lets do a neat trick here.
+        chz = self._findall(table, './thead//th')
         ch = []
         for i in chz:  # iterate over all.
-            ds = i['data-stat'].encode('utf-8')
-            dst = i.getText().encode('utf-8')
+            ds = i.get('data-stat', '').encode('utf-8')
+            dst = self._text(i)
             if len(ds) > len(dst):  # see what is longer.
                 ch.append(dst)
             else:  # cheap but works.
                 ch.append(ds)
         # now each row.
-        rows = table.find('tbody').findAll('tr')
+        rows = self._findall(table, './tbody/tr')
         # our container
         y = collections.defaultdict(list)
         for row in rows:
-            tds = row.findAll('td')
+            tds = self._tdsxp(row)
             # first should be year.
-            yr = int(tds[0].getText().encode('utf-8'))
+            yr = int(self._text(tds[0]))
             # output.
             rest = []
             # rest of the text lets join it up. we iterate over each so we can cherrypick.
             for (i, x) in enumerate(tds[1:]):
                 xch = ch[i+1]
-                xt = x.getText().encode('utf-8')
+                xt = self._text(x)
                 if xch == "age_diff":
                     continue
                 rest.append("{0}: {1}".format(xch, xt))
@@ -1390,9 +2961,8 @@ class MLB(callbacks.Plugin):
         if not out:  # we did NOT find year in their stats.
             irc.reply("ERROR: I did not find {0} stats for {1}. I do have for: {2}".format(optyear, pn, " | ".join([str(z) for z in y.keys()])))
             return
-        # we never know how many stops so lets just for loop it. can get floody/spammy.
-        for q in out:
-            irc.reply("{0} :: {1} :: {2}".format(self._red(pn), self._bold(optyear), " ".join(q)))
+        # we never know how many stops. packed so it doesn't get floody/spammy.
+        self._packreply(irc, msg, [" ".join(q) for q in out], prefix="{0} :: {1} :: ".format(self._red(pn), self._bold(optyear)), separator=" || ")
 
     milbplayerseason = wrap(milbplayerseason, [('int'), ('text')])
 
@@ -1415,23 +2985,19 @@ class MLB(callbacks.Plugin):
             self.log.error("ERROR opening {0}".format(url))
             return None
         # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        div = soup.find('div', attrs={'itemtype': 'http://data-vocabulary.org/Person'})
-        if not div:
+        tree = self._tree(html)
+        div = self._find(tree, '//div[@itemtype="http://data-vocabulary.org/Person"]')
+        if div is None:
             irc.reply("ERROR: No player information for '{0}' at '{1}'".format(optplayer, url))
             return
         # now grab their name.
-        n = div.find('span', attrs={'id': 'player_name'})
-        pn = n.getText().encode('utf-8')
-        n.extract()
-        # remove ads/js.
-        #[a.extract() for a in div.find('div', attrs={'class':'sr_draftstreet '})]
-        [s.extract() for s in div('script')]
-        # remove comments.
-        comments = div.findAll(text=lambda text: isinstance(text, Comment))
-        [comment.extract() for comment in comments]
+        n = self._find(div, './/span[@id="player_name"]')
+        pn = self._text(n)
+        n.drop_tree()
+        # remove js and comments.
+        etree.strip_elements(div, etree.Comment, 'script', with_tail=False)
         # text.
-        t = div.getText(separator=' ').encode('utf-8')
+        t = self._text(div, ' ')
         t = ' '.join(t.split())  # n+1 space = one
         # remove ads?
         t = t.replace("Support us without the ads? Go Ad-Free.", "")
@@ -1464,23 +3030,23 @@ class MLB(callbacks.Plugin):
             self.log.error("ERROR opening {0}".format(url))
             return None
         # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        plrname = soup.find('div', attrs={'class': 'playername'})
-        if not plrname:
+        tree = self._tree(html)
+        plrname = self._find(tree, '//div[@class="playername"]')
+        if plrname is None:
             irc.reply("ERROR: I could not find player's name on: {0}".format(url))
             return
         else:  # grab their name and stuff.
-            plrname = plrname.find('h1').getText().encode('utf-8')
+            plrname = self._text(self._find(plrname, './/h1'))
             plrname = plrname.split('|', 1)[0].strip()  # split at | to strip pos. remove double space.
         # now find the n00z.
-        div = soup.find('div', attrs={'class': 'report'})
-        if not div:
+        div = self._find(tree, '//div[@class="report"]')
+        if div is None:
             irc.reply("ERROR: I could not find player contract for: {0} at {1}".format(optplayer, url))
             return
         # race condition here discovered by someone:
-        parentdiv = div.findParent('div')
-        if parentdiv['class'] == "playercard":
-            irc.reply("{0} :: {1}".format(self._bold(plrname), div.getText().encode('utf-8')))
+        parentdiv = self._find(div, 'ancestor::div[1]')
+        if parentdiv is not None and parentdiv.get('class') == "playercard":
+            irc.reply("{0} :: {1}".format(self._bold(plrname), self._text(div)))
         else:
             irc.reply("{0} :: I'm sorry but no contract details are listed on: {1}".format(self._bold(plrname), url))
 
@@ -1510,21 +3076,21 @@ class MLB(callbacks.Plugin):
             self.log.error("ERROR opening {0}".format(url))
             return None
         # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        plrname = soup.find('div', attrs={'class': 'playername'})
-        if not plrname:
+        tree = self._tree(html)
+        plrname = self._find(tree, '//div[@class="playername"]')
+        if plrname is None:
             irc.reply("ERROR: I could not find player's name on: {0}".format(url))
             return
         else:  # grab their name and stuff.
-            plrname = plrname.find('h1').getText().encode('utf-8')
+            plrname = self._text(self._find(plrname, './/h1'))
             plrname = plrname.split('|', 1)[0].strip()  # split at | to strip pos. remove double space.
         # now find the n00z.
-        div = soup.find('div', attrs={'class': 'playernews'})
-        if not div:
+        div = self._find(tree, '//div[@class="playernews"]')
+        if div is None:
             irc.reply("ERROR: I could not find player news for: {0} at {1}".format(optplayer, url))
             return
         # we do have stuff. output.
-        playerNews = div.getText().encode('utf-8')
+        playerNews = self._text(div)
         # remove html tags before.
         TAG_RE = re.compile(r'<[^>]+>')
         playerNews = TAG_RE.sub('', playerNews)
@@ -1533,12 +3099,111 @@ class MLB(callbacks.Plugin):
 
     mlbplayernews = wrap(mlbplayernews, [('text')])
 
-    def mlbcareerstats(self, irc, msg, args, optplayer):
-        """<player name>
+    def _loadprofilepage(self, profile):
+        """Fetch and parse the player page for profile (name, bio, game). Leaves profile.loaded False on error."""
 
-        Display career totals and season averages for player.
-        Ex: Don Mattingly or Rickey Henderson or Derek Jeter.
-        """
+        if profile.loaded:  # someone beat us to it.
+            return
+        html = self._httpget(profile.url)
+        if not html:
+            return
+        # process html.
+        tree = self._tree(html)
+        div = self._find(tree, '//div[@class="mod-content"]')
+        pname = self._find(div, './/h1') if div is not None else None
+        if pname is None:  # fallback to the first h1 on the page.
+            pname = self._find(tree, '(//h1)[1]')
+        if pname is not None:
+            profile.name = self._text(pname)
+        pdiv = self._find(div, './/div[@class="player-bio"]') if div is not None else None
+        if pdiv is not None:
+            profile.bio = self._text(pdiv, ' ')
+        # current or previous game.
+        maintable = self._find(tree, '//table[@class="player-profile-container"]')
+        if maintable is not None:
+            header = self._find(maintable, './/div[@class="mod-header"]')
+            gamedetails = self._find(maintable, './/div[@class="game-details"]')
+            gametable = self._find(maintable, './/table[@class="tablehead"]')
+            if header is not None and gamedetails is not None and gametable is not None:
+                details = {}
+                for (k, cls) in (('time', 'time'), ('overview', 'overview'), ('away', 'team team-away'), ('home', 'team team-home')):
+                    d = self._find(gamedetails, './/div[@class="{0}"]'.format(cls))
+                    details[k] = self._text(d, ' ')
+                rows = self._findall(gametable, './/tr')
+                details['header'] = self._text(self._find(header, './/h4'))
+                details['colhead'] = [self._text(th) for th in self._findall(gametable, '(.//tr[@class="colhead"])[1]//th')]
+                details['row'] = [self._text(td) for td in self._tdsxp(rows[1])] if len(rows) > 1 else []
+                profile.game = details
+        profile.loaded = True
+
+    def _loadprofilestats(self, profile):
+        """Fetch and parse the stats page for profile into profile.stats. Leaves it None on error."""
+
+        if profile.stats is not None:  # someone beat us to it.
+            return
+        url = profile.url.replace('/mlb/player/_/id/', '/mlb/player/stats/_/id/')
+        html = self._httpget(url)
+        if not html:
+            return
+        stats = {'seasons': {}, 'career': None, 'averages': None}
+        # error check.
+        if "No statistics available." in html:
+            profile.stats = stats
+            return
+        # process html.
+        table = '(//table[@class="tablehead" and @cellspacing="1" and @cellpadding="3"])[1]'
+        rows = self._extract(html, {'h1': ('(//h1)[1]', '.', None),
+                                    'colhead': ('(' + table + '//tr[@class="colhead"])[1]', './/td', None),
+                                    'seasons': (table + '//tr[@class="evenrow" or @class="oddrow"]', './/td', None),
+                                    'totals': (table + '//tr[contains(@class, "oddrow bi") or contains(@class, "evenrow bi")]', './/td', None)})
+        if not profile.name and rows['h1']:
+            profile.name = rows['h1'][0][1][0]
+        if rows['colhead']:
+            colhead = rows['colhead'][0][1]
+            # one row per season (and team).
+            seasons = collections.defaultdict(list)
+            for (group, tds) in rows['seasons']:
+                try:
+                    yr = int(tds[0])
+                except ValueError:
+                    continue
+                seasons[yr].append(dict((colhead[i+1], z) for (i, z) in enumerate(tds[1:])))
+            stats['seasons'] = dict(seasons)
+            # career totals then season averages.
+            trs = rows['totals']
+            if len(trs) == 2:
+                stats['career'] = dict((colhead[k+2], v) for (k, v) in enumerate(trs[0][1][2:]))
+                stats['averages'] = dict((colhead[k+2], v) for (k, v) in enumerate(trs[1][1][1:]))
+        profile.stats = stats
+
+    def _playerprofile(self, url, stats=False):
+        """Return the PlayerProfile for the ESPN player page url or None on error.
+        Profiles are shared for playerProfileTTL seconds. Without stats the player
+        page is loaded; with stats only the season/career tables are (the stats
+        page has the name too)."""
+
+        now = time.time()
+        ttl = self.registryValue('playerProfileTTL')
+        with self._profilelock:
+            profile = self._profiles.get(url)
+            if not profile or profile.built < now - ttl:
+                for (k, v) in self._profiles.items():  # prune while we are here.
+                    if v.built < now - ttl:
+                        del self._profiles[k]
+                profile = self._profiles[url] = PlayerProfile(url)
+        if not stats and not profile.loaded:
+            self._cmdflight.do(('profile', url), self._loadprofilepage, profile)
+            if not profile.loaded:
+                return None
+        if stats and profile.stats is None:
+            self._cmdflight.do(('profilestats', url), self._loadprofilestats, profile)
+            if profile.stats is None:
+                return None
+        return profile
+
+    def _espnprofile(self, irc, optplayer, stats=False):
+        """Find optplayer's ESPN page and return their PlayerProfile. Replies with the
+        error (and suggestions) and returns None if we can't."""
 
         # try and grab a player.
         url = self._pf('e', optplayer)
@@ -1549,88 +3214,54 @@ class MLB(callbacks.Plugin):
             if sp:  # if we get something back, lets return the fullnames.
                 irc.reply("Possible suggestions: {0}".format(" | ".join([i['fullname'].title() for i in sp])))
             # now exit regardless.
-            return
-        # mangle url
-        url = url.replace('/mlb/player/_/id/', '/mlb/player/stats/_/id/')
-        # we do have url now. fetch it.
-        html = self._httpget(url)
-        if not html:
+            return None
+        profile = self._playerprofile(url, stats=stats)
+        if not profile:
             irc.reply("ERROR: Failed to fetch {0}.".format(url))
             self.log.error("ERROR opening {0}".format(url))
             return None
-        # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        plrname = soup.findAll('h1')[0].getText().encode('utf-8')
-        table = soup.find('table', attrs={'class': 'tablehead', 'cellspacing': '1', 'cellpadding': '3'})
-        if not table:  # sanity check.
-            irc.reply("ERROR: Something went wrong looking up career stats for: {0}. Check formatting.".format(optplayer))
+        return profile
+
+    def mlbcareerstats(self, irc, msg, args, optplayer):
+        """<player name>
+
+        Display career totals and season averages for player.
+        Ex: Don Mattingly or Rickey Henderson or Derek Jeter.
+        """
+
+        profile = self._espnprofile(irc, optplayer, stats=True)
+        if not profile:
             return
-        colhead = table.find('tr', attrs={'class': 'colhead'}).findAll('td')
-        trs = table.findAll('tr', attrs={'class': re.compile('oddrow bi|evenrow bi')})
-        #
-        if len(trs) != 2:
+        if not profile.stats['career']:  # sanity check.
             irc.reply("ERROR: Something went wrong looking up career stats for: {0}. Check formatting.".format(optplayer))
             return
-        # first row has two 2ds. lets list cmp this with some nifty one liner!.
-        #careertotals = [self._bold(colhead[i+2].getText()) + ": " + z.getText() for (i, z) in enumerate(trs[0].findAll('td')[2:])]
-        #seasonavg = [self._bold(colhead[i+2].getText()) + ": " + z.getText() for (i, z) in enumerate(trs[1].findAll('td')[1:])]
-        careertotals = {colhead[k+2].getText(): v.getText() for (k, v) in enumerate(trs[0].findAll('td')[2:])}
-        seasonavg = {colhead[k+2].getText(): v.getText() for (k, v) in enumerate(trs[1].findAll('td')[1:])}
-        seasonavg = self._so(seasonavg)  # format both.
-        careertotals = self._so(careertotals)
+        seasonavg = self._so(profile.stats['averages'])  # format both.
+        careertotals = self._so(profile.stats['career'])
         # output time.
-        irc.reply("{0} :: Season Averages :: {1}".format(self._bold(plrname), " | ".join([i for i in seasonavg])))
-        irc.reply("{0} :: Career Totals :: {1}".format(self._bold(plrname), " | ".join([i for i in careertotals])))
+        self._packreply(irc, msg, ["Season Averages :: {0}".format(" | ".join([i for i in seasonavg])),
+                                   "Career Totals :: {0}".format(" | ".join([i for i in careertotals]))],
+                        prefix="{0} :: ".format(self._bold(profile.name)), separator=" || ")
 
     mlbcareerstats = wrap(mlbcareerstats, [('text')])
-    
+
     def mlbgame(self, irc, msg, args, optplayer):
-        """<player name"
+        """<player name>
 
         Try to fetch game stats (in or previous) for player.
         Ex: David Ortiz
         """
 
-        # try and grab a player.
-        url = self._pf('e', optplayer)
-        if not url:
-            irc.reply("ERROR: I could not find a player page for: {0}".format(optplayer))
-            # lets try to help them out with similar names.
-            sp = self._similarPlayers(optplayer)
-            if sp:  # if we get something back, lets return the fullnames.
-                irc.reply("Possible suggestions: {0}".format(" | ".join([i['fullname'].title() for i in sp])))
-            # now exit regardless.
+        profile = self._espnprofile(irc, optplayer)
+        if not profile:
             return
-        # we do have url now. fetch it.
-        html = self._httpget(url)
-        if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
-            return None
-        # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        testtd = soup.find('td', text="This Game")
-        if not testtd:
+        game = profile.game
+        if not game or not game['row'] or game['row'][0] != "This Game":
             irc.reply("ERROR: I did not find current/previous game stats for {0}".format(optplayer))
             return
-        # continue
-        plrname = soup.findAll('h1')[0].getText().encode('utf-8')
-        # otherwise.
-        venue = soup.find('div', attrs={'class':'game-details'})
-        vtime = venue.find('div', attrs={'class':'time'}).getText(separator=' ').encode('utf-8')
-        voverview = venue.find('div', attrs={'class':'overview'}).getText(separator=' ').encode('utf-8')
-        # table
-        table = soup.find('table', attrs={'class': 'tablehead', 'cellspacing': '1', 'cellpadding': '3'})
-        # colhead.
-        colhead = table.find('tr', attrs={'class': 'colhead'})
-        chs = colhead.findAll('th')
-        # row
-        firstrow = table.findAll('tr')[1].findAll('td')
         # mate them together
-        statz = " ".join([chs[i+1].getText() + ": " + v.getText() for (i, v) in enumerate(firstrow[1:])])
+        statz = " ".join([game['colhead'][i+1] + ": " + v for (i, v) in enumerate(game['row'][1:])])
+        irc.reply("{0} :: {1} :: {2} :: {3}".format(profile.name, game['time'], game['overview'], statz))
 
-        irc.reply("{0} :: {1} :: {2} :: {3}".format(plrname, vtime, voverview, statz))
-    
     mlbgame = wrap(mlbgame, [('text')])
 
     def mlbseasonstats(self, irc, msg, args, optyear, optplayer):
@@ -1640,68 +3271,28 @@ class MLB(callbacks.Plugin):
         Ex: 2010 Derek Jeter
         """
 
-        # try and grab a player.
-        url = self._pf('e', optplayer)
-        if not url:
-            irc.reply("ERROR: I could not find a player page for: {0}".format(optplayer))
-            # lets try to help them out with similar names.
-            sp = self._similarPlayers(optplayer)
-            if sp:  # if we get something back, lets return the fullnames.
-                irc.reply("Possible suggestions: {0}".format(" | ".join([i['fullname'].title() for i in sp])))
-            # now exit regardless.
+        profile = self._espnprofile(irc, optplayer, stats=True)
+        if not profile:
             return
-        # now replace the url so we can grab stats.
-        url = url.replace('/mlb/player/_/id/', '/mlb/player/stats/_/id/')
-        # we do have url now. fetch it.
-        html = self._httpget(url)
-        if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
-            return None
-        # error check.
-        if "No statistics available." in html:
+        if not profile.stats['seasons']:
             irc.reply("Sorry, no stats are available for: {0}".format(optplayer))
             return
-        # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        plrname = soup.findAll('h1')[0].getText().encode('utf-8')
-        table = soup.find('table', attrs={'class': 'tablehead', 'cellspacing': '1', 'cellpadding': '3'})
-        colhead = table.find('tr', attrs={'class': 'colhead'}).findAll('td')
-        trs = table.findAll('tr', attrs={'class': re.compile('^evenrow$|^oddrow$')})
-        # sanity check
-        if len(trs) == 0:
-            print "ERROR: Something went wrong grabbing stats. Check HTML formatting."
-        # container
-        st = collections.defaultdict(list)
-        # iterate over their stats.
-        for tr in trs:
-            tds = tr.findAll('td')
-            yr = tds[0].getText()
-            tmp = {}  # tmp dict
-            for (i, z) in enumerate(tds[1:]):  # mate them up with colhead. +1
-                tmp[colhead[i+1].getText()] = z.getText()  # inject.
-            # once done, append tmp to st.
-            st[int(yr)].append(tmp)
         # now lets grab the year.
-        outstat = st.get(optyear)
+        outstat = profile.stats['seasons'].get(optyear)
         # make sure we have that year.
         if not outstat:
-            irc.reply("ERROR: I did not find stats for {0} in {1}.".format(plrname, optyear))
+            irc.reply("ERROR: I did not find stats for {0} in {1}.".format(profile.name, optyear))
             return
         # lets format output.
         outstr = []
         # iterate over each item in the year.
         for q in outstat:  # each item here is going to be a dictionary.
             outstr.append("{0}".format(self._ul(q['TEAM'])))
-            # we do this a little different than normal stats.
-            #for (k, v) in q.items():  # stat items.
-            #   if k != 'TEAM':  # team injected above
-            #       outstr.append("{0}: {1}".format(self._bold(k), v))
             t = {k: v for (k, v) in q.items() if k != 'TEAM'}  # put in dict.
             t = self._so(t)  # format it.
             outstr.extend(t)  # must extend (not append) list
         # finally, output
-        irc.reply("{0} :: {1} Stats :: {2}".format(self._bold(plrname), optyear, " ".join(outstr)))
+        irc.reply("{0} :: {1} Stats :: {2}".format(self._bold(profile.name), optyear, " ".join(outstr)))
 
     mlbseasonstats = wrap(mlbseasonstats, [('int'), ('text')])
 
@@ -1712,39 +3303,14 @@ class MLB(callbacks.Plugin):
         Ex: Derek Jeter
         """
 
-        # try and grab a player.
-        url = self._pf('e', optplayer)
-        if not url:
-            irc.reply("ERROR: I could not find a player page for: {0}".format(optplayer))
-            # lets try to help them out with similar names.
-            sp = self._similarPlayers(optplayer)
-            if sp:  # if we get something back, lets return the fullnames.
-                irc.reply("Possible suggestions: {0}".format(" | ".join([i['fullname'].title() for i in sp])))
-            # now exit regardless.
+        profile = self._espnprofile(irc, optplayer)
+        if not profile:
             return
-        # we do have url now. fetch it.
-        html = self._httpget(url)
-        if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
-            return None
-        # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        div = soup.find('div', attrs={'class': 'mod-content'})
-        if not div:
-            irc.reply("ERROR: Could not find player info for: {0}. Check HTML.".format(optplayer))
-            return
-        # find their name.
-        pname = div.find('h1')
-        if not pname:
-            irc.reply("ERROR: Could not find player info for: {0}. Check HTML.".format(optplayer))
-            return
-        pdiv = div.find('div', attrs={'class': 'player-bio'})
-        if not pdiv:
+        if not profile.name or not profile.bio:
             irc.reply("ERROR: Could not find player info for: {0}. Check HTML.".format(optplayer))
             return
         # now output.
-        irc.reply("{0} :: {1}".format(self._bold(pname.getText().encode('utf-8')), pdiv.getText(separator=' ').encode('utf-8')))
+        irc.reply("{0} :: {1}".format(self._bold(profile.name), profile.bio))
 
     mlbplayerinfo = wrap(mlbplayerinfo, [('text')])
 
@@ -1755,68 +3321,27 @@ class MLB(callbacks.Plugin):
         Ex: Derek Jeter
         """
 
-        # try and grab a player.
-        url = self._pf('e', optplayer)
-        if not url:
-            irc.reply("ERROR: I could not find a player page for: {0}".format(optplayer))
-            # lets try to help them out with similar names.
-            sp = self._similarPlayers(optplayer)
-            if sp:  # if we get something back, lets return the fullnames.
-                irc.reply("Possible suggestions: {0}".format(" | ".join([i['fullname'].title() for i in sp])))
-            # now exit regardless.
+        profile = self._espnprofile(irc, optplayer)
+        if not profile:
             return
-        # we do have url now. fetch it.
-        html = self._httpget(url)
-        if not html:
-            irc.reply("ERROR: Failed to fetch {0}.".format(url))
-            self.log.error("ERROR opening {0}".format(url))
-            return None
-        # process html.
-        soup = BeautifulSoup(html, convertEntities=BeautifulSoup.HTML_ENTITIES, fromEncoding='utf-8')
-        playername = soup.find('div', attrs={'class': 'mod-content'}).find('h1').getText()
-        maintable = soup.find('table', attrs={'class': 'player-profile-container'})
-        if not maintable:  # sanity check.
+        game = profile.game
+        if not game:  # sanity check.
             irc.reply("ERROR: Could not find PREVIOUS or CURRENT game. Check formatting on HTML.")
             return
-        # we did find the maintable.
-        mtheader = maintable.find('div', attrs={'class': 'mod-header'}).find('h4').getText()
-        # have to look at what's in mtheader to determine the statline. we could probably consolidate this but
-        # its easier for me when I have to debug these.
-        if 'PREVIOUS GAME' in mtheader:  # previous game.
-            # find the details of the previous game.
-            gamedetails = maintable.find('div', attrs={'class': 'game-details'})
-            gametime = gamedetails.find('div', attrs={'class': 'time'}).getText(separator=' ')
-            gameaway = gamedetails.find('div', attrs={'class': 'team team-away'}).getText(separator=' ')
-            gamehome = gamedetails.find('div', attrs={'class': 'team team-home'}).getText(separator=' ')
-            gamescore = gamedetails.find('div', attrs={'class': 'scoreboard'}).getText(separator=' ')
-            prevgametable = maintable.find('table', attrs={'class': 'tablehead'})
-            prevcolhead = prevgametable.find('tr', attrs={'class': 'colhead'}).findAll('th')
-            prevgame = prevgametable.findAll('tr')[1].findAll('td')
-            if prevgame[0].getText() != "This Game":
-                irc.reply("ERROR: I do not have previous game stats for {0} ({1}). Perhaps the player did not play in the game?".format(playername, gametime))
-                return
-            #statline = [self._bold(prevcolhead[i+1].getText()) + ": " + x.getText() for (i, x) in enumerate(prevgame[1:])]
-            statline = {prevcolhead[i+1].getText(): x.getText() for (i, x) in enumerate(prevgame[1:])}
-            statline = self._so(statline)
-            irc.reply("{0} :: {1} ({2} @ {3}) :: {4}".format(self._bold(playername), gametime, gameaway, gamehome, " ".join(statline)))
-        elif "CURRENT GAME" in mtheader:
-            gamedetails = maintable.find('div', attrs={'class': 'game-details'})
-            gametime = gamedetails.find('div', attrs={'class': 'time'}).getText(separator=' ')
-            gameaway = gamedetails.find('div', attrs={'class': 'team team-away'}).getText(separator=' ')
-            gamehome = gamedetails.find('div', attrs={'class': 'team team-home'}).getText(separator=' ')
-            # gamescore = gamedetails.find('div', attrs={'class': 'scoreboard'}).getText(separator=' ')
-            curgametable = maintable.find('table', attrs={'class': 'tablehead'})
-            curcolhead = curgametable.find('tr', attrs={'class': 'colhead'}).findAll('th')
-            curgame = curgametable.findAll('tr')[1].findAll('td')
-            if curgame[0].getText() != "This Game":
-                irc.reply("ERROR: I do not have current game stats for {0} ({1}). Perhaps the player is not active?".format(playername, gametime))
-                return
-            #statline = [self._bold(curcolhead[i+1].getText()) + ": " + x.getText() for (i, x) in enumerate(curgame[1:])]
-            statline = {curcolhead[i+1].getText(): x.getText() for (i, x) in enumerate(curgame[1:])}
-            statline = self._so(statline)
-            irc.reply("{0} :: {1} ({2} @ {3}) :: {4}".format(self._bold(playername), gametime, gameaway, gamehome, " ".join(statline)))
+        # have to look at what's in the header to determine the statline.
+        if 'PREVIOUS GAME' in game['header']:
+            missing = "ERROR: I do not have previous game stats for {0} ({1}). Perhaps the player did not play in the game?"
+        elif 'CURRENT GAME' in game['header']:
+            missing = "ERROR: I do not have current game stats for {0} ({1}). Perhaps the player is not active?"
         else:
             irc.reply("ERROR: Could not find PREVIOUS or CURRENT game. Check formatting on HTML.")
+            return
+        if not game['row'] or game['row'][0] != "This Game":
+            irc.reply(missing.format(profile.name, game['time']))
+            return
+        statline = {game['colhead'][i+1]: x for (i, x) in enumerate(game['row'][1:])}
+        statline = self._so(statline)
+        irc.reply("{0} :: {1} ({2} @ {3}) :: {4}".format(self._bold(profile.name), game['time'], game['away'], game['home'], " ".join(statline)))
 
     mlbgamestats = wrap(mlbgamestats, [('text')])
 
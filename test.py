@@ -2,11 +2,28 @@
 # see LICENSE.txt for information.
 ###
 
+import os
+import re
+import sys
+import time
+import datetime
+import threading
+
 from supybot.test import *
+import supybot.conf as conf
+import supybot.ircmsgs as ircmsgs
 
 class MLBTestCase(PluginTestCase):
     plugins = ('MLB',)
-    
+
+    def setUp(self):
+        PluginTestCase.setUp(self)
+        # pages are replayed from fixtures/ next to this file. MLB_FIXTURES=<dir> replays another set.
+        # set MLB_FIXTURES_MODE=record once (online) to fill a directory, or off to use the live sites.
+        fixtures = os.environ.get('MLB_FIXTURES') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+        conf.supybot.plugins.MLB.fixtures.directory.setValue(fixtures)
+        conf.supybot.plugins.MLB.fixtures.mode.setValue(os.environ.get('MLB_FIXTURES_MODE', 'replay'))
+
     def testMLB(self):
         # milbplayerinfo, milbplayerseason, mlballstargame, mlbarrests, mlbawards,
         # mlbbox, mlbcareerleaders, mlbcareerstats, mlbchanlineup, mlbcountdown, mlbcyyoung,
@@ -22,3 +39,220 @@ class MLBTestCase(PluginTestCase):
         self.assertNotError('mlbarrests')
         self.assertNotError('mlbawards 2013')
         self.assertNotError('mlbcareerleaders batting batavg')
+        self.assertNotError('mlbmore')
+        self.assertNotError('mlbschedule ALE')
+
+    def testReplay(self):
+        # replies built from the pages in fixtures/.
+        if conf.supybot.plugins.MLB.fixtures.mode() != 'replay':
+            return
+        self.assertResponse('mlbworldseries 2013', "{0} World Series :: Winner: {1}  Loser: St. Louis Cardinals  Series: 4-2".format(
+                            ircutils.mircColor('2013', 'red'), ircutils.bold('Boston Red Sox')))
+        self.assertRegexp('mlballstargame 2013', r'Score: AL 3, NL 0  Location: New York\(Citi Field\)  Att: 45,186  MVP: Mariano Rivera, NYY')
+        self.assertRegexp('mlbawards 2013', 'MVP: AL \x02Miguel Cabrera\x02 NL \x02Andrew McCutchen\x02  CY: AL \x02Max Scherzer\x02 '
+                          'NL \x02Clayton Kershaw\x02  ROY: AL \x02Wil Myers\x02 NL \x02Jose Fernandez\x02  MGR: AL \x02Terry Francona\x02 NL \x02Clint Hurdle\x02')
+        self.assertRegexp('mlbcareerleaders batting batavg', r'1\. \x02Ty Cobb\x02 \(\.3664\) \| 2\. \x02Rogers Hornsby\x02 \(\.3585\) \| '
+                          r'3\. \x02Shoeless Joe Jackson\x02 \(\.3558\) \| 4\. \x02\x1fJose Altuve\x1f\x02 \(\.3070\)')
+        self.assertRegexp('mlbroster NYY', r'NYY.* :: \x02Pitchers\x02: Gerrit Cole \(SP\) \| Clay Holmes \(RP\) \| \x02Catchers\x02: Jose Trevino \(C\)$')
+        self.assertRegexp('mlbschedule NYY', r'\x02NYY\x02 :: Fri, Mar 29 @Houston 7:10 PM \| Sat, Mar 30 @Houston 7:15 PM \| '
+                          r'Mon, Apr 1 @Arizona 9:40 PM \| Fri, Apr 5 vs Toronto 1:05 PM \| Sat, Apr 6 vs Toronto 1:05 PM$')
+        self.assertRegexp('mlbinjury BOS', r'BOS.* :: 2 Injuries :: Chris Sale \(2025\) \| Trevor Story \(September\)$')
+        self.assertRegexp('mlbinjury --details BOS', r'\x02Chris Sale\x02 60-Day IL since Mar 4: Elbow, returns 2025')
+        self.assertResponse('mlbpayroll NYY', "{0} :: 301.0M | Base Salaries: 250.0M | Signing Bonuses: 50.0M | Incentives: 1.0M".format(
+                            ircutils.bold('New York Yankees 2024 Payroll')))
+
+    def testAwardsInProgress(self):
+        # awards still being announced are served from memory on every call, never stored.
+        mlb = self.irc.getCallback('MLB')
+        year = datetime.date.today().year
+        row = dict((k, 'Winner') for k in ('almvp', 'nlmvp', 'alcy', 'nlcy', 'alroy', 'nlroy', 'almgr'))
+        row.update({'year': year, 'nlmgr': ''})
+        calls = []
+        mlb._fetchawards = lambda optyear: calls.append(optyear) or dict(row)
+        self.assertRegexp('mlbawards {0}'.format(year), 'Winner')
+        self.assertRegexp('mlbawards {0}'.format(year), 'Winner')
+        self.assertEqual(calls, [year])
+        self.assertIsNone(mlb._historyget('awards', year))
+
+    def testPlayerSearchBlocked(self):
+        # a page without google's results (consent, captcha) is not a miss.
+        mlb = self.irc.getCallback('MLB')
+        mlb._httpget = lambda url, h=None, d=None, l=True, c=None: '<html><body><form id="captcha"></form></body></html>'
+        self.assertIsNone(mlb._pf('e', 'nobody here'))
+        self.assertIsNone(mlb._pfcacheget('e', 'nobody here'))
+        mlb._httpget = lambda url, h=None, d=None, l=True, c=None: '<html><body><div id="search"></div></body></html>'
+        self.assertIsNone(mlb._pf('e', 'nobody here'))
+        self.assertEqual(mlb._pfcacheget('e', 'nobody here'), (None,))
+
+    def testLeadersNoResults(self):
+        mlb = self.irc.getCallback('MLB')
+        mlb._httpget = lambda url, h=None, d=None, l=True, c=None: '<html><body>No results available based on the selected criteria.</body></html>'
+        self.assertRegexp('mlbleaders al hr', 'No results available')
+
+    def testInjuryPartialFailure(self):
+        # one team failing doesn't lose the others. the prefix names the resolved teams.
+        mlb = self.irc.getCallback('MLB')
+        page = ('<html><body><div class="player">Player</div><table align="center" width="600px;">'
+                '<tr><td>Name</td><td>Pos</td><td>Team</td><td>Status</td><td>Date</td><td>Injury</td><td>Returns</td></tr>'
+                '<tr><td>Some Pitcher</td><td>P</td><td>BOS</td><td>15-Day DL</td><td>Apr 1</td><td>Elbow</td><td>May</td></tr>'
+                '</table></body></html>')
+        def httpget(url, h=None, d=None, l=True, c=None):
+            if url == mlb._injuriesurl('NYY'):
+                raise ValueError(url)
+            return page
+        mlb._httpget = httpget
+        self.assertRegexp('mlbinjury nyy,bos', r'NYY, BOS.*1 Injuries.*NYY.*failed to fetch.*BOS.*Some Pitcher \(May\)')
+        self.assertRegexp('mlbinjury nyy,xyz', 'Team not found: XYZ')
+
+    def _executor(self, workers, depth, peruser):
+        mlb = self.irc.getCallback('MLB')
+        log = ExecutorLog()
+        ex = sys.modules[mlb.__class__.__module__].CommandExecutor(workers, depth, peruser, log)
+        self.addCleanup(ex.stop)
+        return (ex, log)
+
+    def testExecutorLimits(self):
+        # no workers, so nothing leaves the queue.
+        (ex, log) = self._executor(0, 3, 2)
+        self.assertTrue(ex.submit('#a', 'alice', len, ''))
+        self.assertTrue(ex.submit('#a', 'alice', len, ''))
+        self.assertFalse(ex.submit('#a', 'alice', len, ''))  # alice's share.
+        self.assertTrue(ex.submit('#b', 'bob', len, ''))
+        self.assertFalse(ex.submit('#b', 'carol', len, ''))  # queue depth.
+        self.assertEqual((len(ex), ex.rejected), (3, 2))
+
+    def testExecutorBusyReply(self):
+        mlb = self.irc.getCallback('MLB')
+        mlb._executor.stop()
+        (mlb._executor, log) = self._executor(0, 1, 1)
+        mlb._executor.submit('#other', 'someone', len, '')  # queue is now full.
+        self.assertResponse('mlbawards 2013', "Sorry, I'm busy right now. Try again in a minute.")
+        self.assertNotError('mlbteams')  # inline commands never queue.
+
+    def testExecutorFairness(self):
+        # one worker, held on a gate while the queue fills. each channel takes its turn.
+        (ex, log) = self._executor(1, 10, 10)
+        (gate, done, order) = (threading.Event(), threading.Event(), [])
+        ex.submit('#gate', 'gate', gate.wait, 5)
+        for (target, job) in (('#a', 'a1'), ('#a', 'a2'), ('#a', 'a3'), ('#b', 'b1')):
+            ex.submit(target, job, order.append, job)
+        ex.submit('#c', 'done', done.set)
+        gate.set()
+        self.assertTrue(done.wait(5))
+        self.assertEqual(order, ['a1', 'b1', 'a2', 'a3'])
+
+    def testExecutorSurvivesErrors(self):
+        (ex, log) = self._executor(1, 10, 10)
+        done = threading.Event()
+        ex.submit('#a', 'alice', int, 'not a number')
+        ex.submit('#a', 'alice', done.set)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(len(log.exceptions), 1)
+
+    def testExecutorStop(self):
+        # stop drops what is queued and the workers exit after their current job.
+        (ex, log) = self._executor(2, 10, 10)
+        (gate, ran) = (threading.Event(), [])
+        ex.submit('#a', 'alice', gate.wait, 5)
+        ex.submit('#b', 'bob', gate.wait, 5)
+        ex.submit('#c', 'carol', ran.append, 'carol')
+        ex.stop()
+        self.assertFalse(ex.submit('#d', 'dave', ran.append, 'dave'))
+        gate.set()
+        self.assertTrue(ex.join(5))
+        self.assertEqual((ran, len(ex)), ([], 0))
+
+    def _page(self, query, **kwargs):
+        # the replies to query, up to the one pointing at mlbmore (or pages.lines of them).
+        replies = [self.getMsg(query, **kwargs).args[1]]
+        deadline = time.time() + 1
+        while len(replies) < conf.supybot.plugins.MLB.pages.lines() and 'more: mlbmore' not in replies[-1] and time.time() < deadline:
+            m = self.irc.takeMsg()
+            if m is None:
+                time.sleep(0.01)
+            else:
+                replies.append(m.args[1])
+        return replies
+
+    def testPackReplyLineLimit(self):
+        # every packed line, "N more" included, fits in 512 bytes on the wire.
+        mlb = self.irc.getCallback('MLB')
+        irc = PackIrc('MLB!~limnoria@bot.example.org')
+        msg = ircmsgs.privmsg('#baseball', 'mlbinjury ALE', prefix='alice!~alice@example.com')
+        items = [u"{0} Jos\xe9 Player {1} (60-Day DL)".format(ircutils.bold(i), i) for i in range(200)]
+        mlb._packreply(irc, msg, items, prefix="ALE :: 200 Injuries :: ")
+        lines = irc.replies + mlb._pages.take(mlb._pagekey(msg), 1000)[0]
+        self.assertEqual(len(irc.replies), conf.supybot.plugins.MLB.pages.lines())
+        self.assertTrue(irc.replies[-1].endswith(ircutils.bold("({0} more: mlbmore)".format(len(lines) - len(irc.replies)))))
+        for line in lines:
+            self.assertTrue(line.startswith("ALE :: 200 Injuries :: "))
+            self.assertTrue(len(":{0} PRIVMSG #baseball :alice: {1}\r\n".format(irc.prefix, line)) <= 512, line)
+        # nothing is lost or split.
+        packed = [re.sub(r' \x02\(\d+ more: mlbmore\)\x02$', '', line[len("ALE :: 200 Injuries :: "):]) for line in lines]
+        self.assertEqual(" | ".join(packed), " | ".join([i.encode('utf-8') for i in items]))
+
+    def _injurypage(self, n):
+        row = '<tr><td>Player {0}</td><td>P</td><td>BOS</td><td>15-Day DL</td><td>Apr 1</td><td>Sore right elbow</td><td>Late May</td></tr>'
+        return ('<html><body><div class="player">Player</div><table align="center" width="600px;">' + row.format('') +
+                ''.join([row.format(i) for i in range(n)]) + '</table></body></html>')
+
+    def testMore(self):
+        mlb = self.irc.getCallback('MLB')
+        mlb._httpget = lambda url, h=None, d=None, l=True, c=None: self._injurypage(40)
+        first = self._page('mlbinjury --details bos')
+        self.assertEqual(len(first), 3)
+        self.assertTrue(first[0].startswith(ircutils.mircColor('BOS', 'red') + ' :: 40 Injuries :: '))
+        pages = [first]
+        while 'more: mlbmore' in pages[-1][-1]:
+            pages.append(self._page('mlbmore'))
+        self.assertTrue(len(pages) > 2)
+        self.assertTrue(len(pages[-1]) <= 3)
+        # every injury shows up once, in order.
+        text = ' '.join([' '.join(page) for page in pages])
+        self.assertEqual(re.findall(r'Player (\d+)', text), [str(i) for i in range(40)])
+        self.assertResponse('mlbmore', 'Nothing more to show. Pages are kept for {0} seconds.'.format(conf.supybot.plugins.MLB.pages.ttl()))
+
+    def testMoreExpires(self):
+        mlb = self.irc.getCallback('MLB')
+        mlb._httpget = lambda url, h=None, d=None, l=True, c=None: self._injurypage(40)
+        self._page('mlbinjury --details bos')
+        mlb._pages.ttl = -1  # what is kept now is already past pages.ttl.
+        self._page('mlbinjury --details bos')
+        self.assertRegexp('mlbmore', 'Nothing more to show')
+
+    def testMorePerUser(self):
+        # pages are kept per channel (or private) and nick.
+        mlb = self.irc.getCallback('MLB')
+        mlb._httpget = lambda url, h=None, d=None, l=True, c=None: self._injurypage(40)
+        self._page('mlbinjury --details bos')
+        self.assertRegexp('mlbmore', 'Nothing more to show', frm='other!other@example.com')
+        self.assertRegexp('mlbmore', 'Player')
+        pages = mlb._pages
+        keys = [mlb._pagekey(ircmsgs.privmsg(to, 'mlbmore', prefix=frm)) for (to, frm) in
+                (('#a', 'alice!a@a'), ('#b', 'alice!a@a'), ('#a', 'bob!b@b'), (self.irc.nick, 'alice!a@a'))]
+        for (i, key) in enumerate(keys):
+            pages.set(key, [str(i)])
+        self.assertEqual([pages.take(key, 3) for key in keys], [(['0'], 0), (['1'], 0), (['2'], 0), (['3'], 0)])
+        self.assertEqual(mlb._pagekey(ircmsgs.privmsg('#A', 'x', prefix='Alice!a@a')), keys[0])
+
+
+class PackIrc(object):
+    """Collects what _packreply sends."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.nick = prefix.split('!')[0]
+        self.replies = []
+
+    def reply(self, s, **kwargs):
+        self.replies.append(s)
+
+
+class ExecutorLog(object):
+    """Collects what CommandExecutor logs."""
+
+    def __init__(self):
+        self.exceptions = []
+
+    def exception(self, msg, *args):
+        self.exceptions.append(msg)